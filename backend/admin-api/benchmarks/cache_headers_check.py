@@ -0,0 +1,73 @@
+'''
+Business: Check that admin-api marks anonymous site reads as shared-cacheable and everything else as private
+Args: command line - none; needs DATABASE_URL pointing at a database with the migrations applied
+Returns: prints the Cache-Control header of each path and exits non-zero on a mismatch
+'''
+
+import json
+import os
+import sys
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import index
+
+def get(params: Dict) -> Tuple[int, str, object]:
+    response = index.handler({'httpMethod': 'GET', 'queryStringParameters': params, 'headers': {}}, None)
+    return response['statusCode'], response['headers'].get('Cache-Control', ''), json.loads(response['body'])
+
+def create_news(status: str) -> int:
+    response = index.handler({
+        'httpMethod': 'POST',
+        'queryStringParameters': {'resource': 'news'},
+        'body': json.dumps({
+            'title': f'Cache header check ({status})',
+            'category_code': 'politics',
+            'time_label': 'now',
+            'image_url': 'https://example.test/cache.jpg',
+            'moderation_status': status
+        })
+    }, None)
+    return json.loads(response['body'])['id']
+
+def delete_news(news_id: int) -> None:
+    index.handler({'httpMethod': 'DELETE', 'queryStringParameters': {'resource': 'news', 'id': str(news_id)}}, None)
+
+def main(argv: List[str]) -> None:
+    published_id = create_news('published')
+    draft_id = create_news('draft')
+    public, private = index.PUBLIC_CACHE_CONTROL, index.CACHE_CONTROL
+    cases = [
+        ('published news list', {'resource': 'news'}, public),
+        ('published news page', {'resource': 'news', 'limit': '10', 'cursor': ''}, public),
+        ('published news detail', {'resource': 'news', 'id': str(published_id)}, public),
+        ('categories', {'resource': 'categories'}, public),
+        ('draft news list', {'resource': 'news', 'status': 'draft'}, private),
+        ('draft news detail', {'resource': 'news', 'id': str(draft_id)}, private),
+        ('missing news detail', {'resource': 'news', 'id': '0'}, private),
+        ('news batch', {'resource': 'news', 'ids': f'{published_id},{draft_id}'}, private),
+        ('admin news list', {'resource': 'news', 'fresh': '1'}, private),
+        ('admin categories', {'resource': 'categories', 'fresh': '1'}, private),
+        ('stats', {'resource': 'stats'}, private),
+        ('search', {'resource': 'search', 'q': 'check'}, private),
+        ('banner slots', {'resource': 'banner-slots', 'placements': 'header'}, private),
+        ('import jobs', {'resource': 'import-jobs'}, private)
+    ]
+    failures = []
+    try:
+        for name, params, expected in cases:
+            status, cache_control, _ = get(params)
+            ok = status == 200 and cache_control == expected
+            print(f"  {'ok  ' if ok else 'FAIL'} {name}: {status} {cache_control}")
+            if not ok:
+                failures.append(name)
+    finally:
+        delete_news(published_id)
+        delete_news(draft_id)
+    if failures:
+        raise SystemExit(f'unexpected Cache-Control: {failures}')
+    print(f'ok: {len(cases)} paths checked')
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
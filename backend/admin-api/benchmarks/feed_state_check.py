@@ -0,0 +1,106 @@
+'''
+Business: Check conditional fetching and the GUID high-water mark of the news importer against a local RSS stand-in
+Args: command line - --items published in the feed, --new items added between runs, --limit per import
+Returns: prints each import round and exits non-zero when an item is skipped or a 304 is not honoured
+'''
+
+import argparse
+import hashlib
+import os
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import index
+
+class FeedState:
+    def __init__(self, count: int):
+        self.count = count
+        self.requests: List[int] = []
+
+    def render(self) -> bytes:
+        started = datetime(2026, 1, 1, tzinfo=timezone(timedelta(hours=3)))
+        items = ''.join(
+            f'<item><title>Item {n}</title><link>https://example.test/{n}</link><guid>item-{n}</guid>'
+            f'<pubDate>{format_datetime(started + timedelta(minutes=n))}</pubDate></item>'
+            for n in range(self.count, 0, -1)
+        )
+        return f'<?xml version="1.0"?><rss><channel><title>t</title>{items}</channel></rss>'.encode('utf-8')
+
+def make_handler(feed: FeedState):
+    class FeedHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = feed.render()
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            if self.headers.get('If-None-Match') == etag:
+                feed.requests.append(304)
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            feed.requests.append(200)
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FeedHandler
+
+def run_round(feed: Dict, limit: int, state: Dict, seen: set) -> Dict:
+    collected = index.collect_feed_items(feed, limit, state)
+    guids = [item['guid'] for item in collected['items']]
+    seen.update(guids)
+    print(f"  status={'304' if collected['not_modified'] else '200'} parsed={len(guids)} "
+          f"truncated={collected.get('truncated', False)} last_guid={collected['state']['last_guid']}")
+    for item in collected['items']:
+        if item['pub_date'] is not None and item['pub_date'].tzinfo is not None:
+            raise SystemExit('pub_date must be naive UTC for the TIMESTAMP column')
+    return collected['state']
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=15)
+    parser.add_argument('--new', type=int, default=25)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    feed_state = FeedState(args.items)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(feed_state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    feed = {'name': 'check', 'type': 'rss', 'url': f'http://127.0.0.1:{server.server_address[1]}/rss'}
+
+    seen: set = set()
+    print('initial import')
+    state = run_round(feed, args.limit, {}, seen)
+    first_batch = set(seen)
+
+    print('unchanged feed')
+    state = run_round(feed, args.limit, state, seen)
+    if feed_state.requests[-1] != 304:
+        raise SystemExit('expected 304 for an unchanged feed')
+
+    feed_state.count += args.new
+    print(f'{args.new} new items published')
+    while True:
+        state = run_round(feed, args.limit, state, seen)
+        if feed_state.requests[-1] == 304:
+            break
+
+    expected = {f'item-{n}' for n in range(args.items + 1, args.items + args.new + 1)} | first_batch
+    missing = sorted(expected - seen, key=lambda guid: int(guid.split('-')[1]))
+    server.shutdown()
+    if missing:
+        raise SystemExit(f'skipped items: {missing}')
+    print(f'ok: {len(seen)} items imported, none skipped')
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
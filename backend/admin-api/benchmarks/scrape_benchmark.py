@@ -0,0 +1,67 @@
+'''
+Business: Compare HTML scraping backends used by the news importer on saved pages
+Args: command line - fixture paths (default: all benchmarks/fixtures/*.html, a synthetic page; pass saved production pages for real numbers), --repeat, --limit, --backends
+Returns: prints parse time and peak memory per backend and fixture (tracemalloc, Python-level allocations)
+'''
+
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import index
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+def run_backend(backend: str, html: str, rules: Dict, limit: int, repeat: int) -> Dict:
+    scrape = index.SCRAPE_BACKENDS[backend]
+    items = list(scrape(html, rules, limit))
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in scrape(html, rules, limit):
+            pass
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    for _ in scrape(html, rules, limit):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'items': len(items),
+        'median_ms': timings[len(timings) // 2],
+        'min_ms': timings[0],
+        'peak_kib': peak / 1024
+    }
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('fixtures', nargs='*')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--backends', default=','.join(index.SCRAPE_BACKENDS))
+    args = parser.parse_args(argv)
+
+    fixtures = args.fixtures or sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html')))
+    backends = [backend.strip() for backend in args.backends.split(',') if backend.strip()]
+
+    print(f"{'fixture':<28} {'backend':<8} {'items':>5} {'median ms':>10} {'min ms':>8} {'peak KiB':>9}")
+    for path in fixtures:
+        with open(path, encoding='utf-8') as fixture:
+            html = fixture.read()
+        for backend in backends:
+            result = run_backend(backend, html, index.GLOBALMSK_RULES, args.limit, args.repeat)
+            print(f"{os.path.basename(path):<28} {backend:<8} {result['items']:>5} "
+                  f"{result['median_ms']:>10.2f} {result['min_ms']:>8.2f} {result['peak_kib']:>9.0f}")
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
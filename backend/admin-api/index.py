@@ -7,17 +7,212 @@ Returns: HTTP response dict with statusCode, headers, body
 
 import json
 import os
-from typing import Dict, Any, List
+import base64
+import binascii
+import hashlib
+import math
+import random
+import re
+import time
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict, deque
+from typing import Dict, Any, Callable, Iterator, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin, urlparse
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool, PoolError
 import requests
 from bs4 import BeautifulSoup
-from datetime import datetime
+import lxml.html
+from lxml import etree as lxml_etree
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 import xml.etree.ElementTree as ET
 
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', '1'))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', '5'))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '5'))
+
+_db_pool = None
+_pool_stats = {'hits': 0, 'misses': 0, 'reconnects': 0, 'checkouts': 0, 'wait_ms_total': 0.0, 'wait_ms_max': 0.0}
+_pool_idle: set = set()
+_pool_in_use = {'count': 0}
+_pool_lock = threading.Lock()
+
+def get_db_pool() -> ThreadedConnectionPool:
+    global _db_pool
+    if _db_pool is None or _db_pool.closed:
+        dsn = os.environ.get('DATABASE_URL')
+        _db_pool = ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, dsn, cursor_factory=RealDictCursor)
+    return _db_pool
+
+def is_connection_healthy(conn) -> bool:
+    return not conn.closed and conn.info.transaction_status != TRANSACTION_STATUS_UNKNOWN
+
+def checkout_connection(pool: ThreadedConnectionPool, started: float):
+    while True:
+        try:
+            conn = pool.getconn()
+            with _pool_lock:
+                reused = id(conn) in _pool_idle
+                _pool_idle.discard(id(conn))
+                _pool_in_use['count'] += 1
+            return conn, reused
+        except PoolError:
+            if time.monotonic() - started > DB_POOL_TIMEOUT:
+                raise
+            time.sleep(0.01)
+
 def get_db_connection():
-    dsn = os.environ.get('DATABASE_URL')
-    return psycopg2.connect(dsn, cursor_factory=RealDictCursor)
+    pool = get_db_pool()
+    started = time.monotonic()
+    conn, reused = checkout_connection(pool, started)
+    while reused and not is_connection_healthy(conn):
+        pool.putconn(conn, close=True)
+        with _pool_lock:
+            _pool_in_use['count'] -= 1
+        _pool_stats['reconnects'] += 1
+        conn, reused = checkout_connection(pool, started)
+    wait_ms = (time.monotonic() - started) * 1000
+    _pool_stats['hits' if reused else 'misses'] += 1
+    _pool_stats['checkouts'] += 1
+    _pool_stats['wait_ms_total'] += wait_ms
+    _pool_stats['wait_ms_max'] = max(_pool_stats['wait_ms_max'], wait_ms)
+    return conn
+
+def release_db_connection(conn, broken: bool = False) -> None:
+    pool = get_db_pool()
+    if not broken and not conn.closed and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            broken = True
+    pool.putconn(conn, close=broken or bool(conn.closed))
+    with _pool_lock:
+        _pool_in_use['count'] -= 1
+        if not conn.closed:
+            _pool_idle.add(id(conn))
+
+def with_db_cursor(load: Callable[[Any], Any]) -> Any:
+    conn = get_db_connection()
+    cur = None
+    broken = False
+    try:
+        cur = conn.cursor()
+        return load(cur)
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        if cur is not None and not cur.closed:
+            cur.close()
+        release_db_connection(conn, broken)
+
+def get_pool_stats() -> Dict[str, Any]:
+    checkouts = _pool_stats['checkouts']
+    return {
+        **_pool_stats,
+        'wait_ms_avg': round(_pool_stats['wait_ms_total'] / checkouts, 3) if checkouts else 0.0,
+        'hit_ratio': round(_pool_stats['hits'] / checkouts, 3) if checkouts else 0.0,
+        'pool_min': DB_POOL_MIN,
+        'pool_max': DB_POOL_MAX,
+        'idle': len(_pool_idle),
+        'in_use': _pool_in_use['count']
+    }
+
+LOOKUP_CACHE_MAX_ENTRIES = int(os.environ.get('LOOKUP_CACHE_MAX_ENTRIES', '256'))
+LOOKUP_CACHE_TTL = float(os.environ.get('LOOKUP_CACHE_TTL', '300'))
+
+_MISSING = object()
+
+class TTLCache:
+    def __init__(self, max_entries: int, default_ttl: float):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key: tuple, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def get_or_load(self, key: tuple, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        value = self.get(key)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value, ttl)
+        return value
+    
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == namespace]:
+                del self._entries[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'default_ttl': self.default_ttl
+        }
+
+lookup_cache = TTLCache(LOOKUP_CACHE_MAX_ENTRIES, LOOKUP_CACHE_TTL)
+
+ID_LIST_MAX = int(os.environ.get('ID_LIST_MAX', '100'))
+
+class BadRequest(ValueError):
+    pass
+
+class Conflict(Exception):
+    def __init__(self, message: str, existing_id: Any):
+        super().__init__(message)
+        self.existing_id = existing_id
+
+def int_param(params: Dict, name: str, default: int, low: int, high: int) -> int:
+    try:
+        value = int(params.get(name, default))
+    except (TypeError, ValueError):
+        raise BadRequest(f'{name} must be an integer')
+    return max(low, min(value, high))
+
+def float_param(params: Dict, name: str, default: float, low: float, high: float) -> float:
+    try:
+        value = float(params.get(name, default))
+    except (TypeError, ValueError):
+        raise BadRequest(f'{name} must be a number')
+    if not math.isfinite(value):
+        raise BadRequest(f'{name} must be a number')
+    return max(low, min(value, high))
 
 def sql_escape(value: Any) -> str:
     if value is None:
@@ -37,7 +232,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'headers': {
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-Auth-Token',
+                'Access-Control-Allow-Headers': 'Content-Type, X-Auth-Token, If-None-Match, If-Modified-Since',
                 'Access-Control-Max-Age': '86400'
             },
             'body': '',
@@ -48,33 +243,92 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     resource = params.get('resource', 'news')
     news_id = params.get('id')
     
+    if method == 'GET' and resource in ('pool-stats', 'cache-stats'):
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps(get_pool_stats() if resource == 'pool-stats' else lookup_cache.stats()),
+            'isBase64Encoded': False
+        }
+    
+    if method == 'GET' and (resource in ('categories', 'banner-slots') or (resource == 'banners' and not params.get('id'))):
+        try:
+            if resource == 'categories':
+                result = get_categories()
+            elif resource == 'banners':
+                result = get_banners_list(params.get('placement'))
+            else:
+                result = select_banners(params)
+        except BadRequest as e:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': str(e)}, ensure_ascii=False),
+                'isBase64Encoded': False
+            }
+        except Exception as e:
+            return {
+                'statusCode': 500,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': str(e)}, ensure_ascii=False),
+                'isBase64Encoded': False
+            }
+        return conditional_get(event, {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps(result, ensure_ascii=False, default=str),
+            'isBase64Encoded': False
+        }, cache_control=cache_control_for(params, result))
+    
+    conn = None
+    cur = None
+    broken = False
+    
     try:
         conn = get_db_connection()
         cur = conn.cursor()
         
         if method == 'GET':
-            if resource == 'import-news':
-                limit = int(params.get('limit', 20))
-                result = import_globalmsk_news(conn, cur, limit)
-            elif resource == 'import-rss':
-                limit = int(params.get('limit', 20))
-                result = import_rss_feed(conn, cur, limit)
+            if resource in ('import-news', 'import-rss', 'import-all'):
+                limit = int_param(params, 'limit', 20, 1, IMPORT_MAX_LIMIT)
+                force = params.get('force') in ('1', 'true')
+                if resource == 'import-news':
+                    feeds = select_feeds(feed_type='html')
+                elif resource == 'import-rss':
+                    feeds = select_feeds(feed_type='rss')
+                else:
+                    feeds = select_feeds(params.get('feeds'))
+                if params.get('async') in ('1', 'true'):
+                    result = enqueue_import_jobs(conn, cur, feeds, limit, force)
+                else:
+                    result = import_feeds(conn, cur, feeds, limit, force)
+            elif resource == 'import-jobs':
+                result = get_import_jobs(cur, params)
             elif resource == 'news':
                 if news_id:
                     result = get_news_detail(cur, news_id)
+                elif params.get('ids'):
+                    result = get_news_detail_batch(cur, parse_id_list(params['ids']))
                 else:
                     result = get_news_list(cur, params)
-            elif resource == 'categories':
-                result = get_categories(cur)
+            elif resource == 'search':
+                result = search_news(cur, params)
             elif resource == 'stats':
                 result = get_stats(cur)
             elif resource == 'banners':
-                placement = params.get('placement')
-                banner_id = params.get('id')
-                if banner_id:
-                    result = get_banner_detail(cur, banner_id)
-                else:
-                    result = get_banners_list(cur, placement)
+                result = get_banner_detail(cur, params.get('id'))
             else:
                 result = {'error': 'Unknown resource'}
         
@@ -86,6 +340,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 result = create_category(conn, cur, body_data)
             elif resource == 'banner':
                 result = create_banner(conn, cur, body_data)
+            elif resource == 'import-worker':
+                result = run_import_worker(int_param(body_data, 'concurrency', 0, 0, 64),
+                                           float_param(body_data, 'max_seconds', 0, 0, IMPORT_WORKER_MAX_SECONDS))
             else:
                 result = {'error': 'Unknown resource'}
         
@@ -111,10 +368,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         else:
             result = {'error': 'Method not allowed'}
         
-        cur.close()
-        conn.close()
-        
-        return {
+        response = {
             'statusCode': 200,
             'headers': {
                 'Content-Type': 'application/json',
@@ -123,8 +377,35 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'body': json.dumps(result, ensure_ascii=False, default=str),
             'isBase64Encoded': False
         }
+        
+        if method == 'GET' and resource not in ('import-news', 'import-rss', 'import-all'):
+            return conditional_get(event, response, record_timestamp(result), cache_control_for(params, result))
+        return response
+    
+    except BadRequest as e:
+        return {
+            'statusCode': 400,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': str(e)}, ensure_ascii=False),
+            'isBase64Encoded': False
+        }
+    
+    except Conflict as e:
+        return {
+            'statusCode': 409,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': str(e), 'id': e.existing_id}, ensure_ascii=False),
+            'isBase64Encoded': False
+        }
     
     except Exception as e:
+        broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
         return {
             'statusCode': 500,
             'headers': {
@@ -134,37 +415,186 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'body': json.dumps({'error': str(e)}, ensure_ascii=False),
             'isBase64Encoded': False
         }
+    
+    finally:
+        if cur is not None and not cur.closed:
+            cur.close()
+        if conn is not None:
+            release_db_connection(conn, broken)
+
+CACHE_CONTROL = os.environ.get('ADMIN_CACHE_CONTROL', 'private, no-cache')
+PUBLIC_CACHE_CONTROL = os.environ.get('ADMIN_PUBLIC_CACHE_CONTROL', 'public, max-age=30, stale-while-revalidate=60')
+
+def cache_control_for(params: Dict, result: Any) -> str:
+    # Anonymous site reads (published news, categories) may be shared by the CDN; admin screens pass fresh=1
+    if params.get('fresh') in ('1', 'true') or (isinstance(result, dict) and 'error' in result):
+        return CACHE_CONTROL
+    resource = params.get('resource', 'news')
+    if resource == 'categories':
+        return PUBLIC_CACHE_CONTROL
+    if resource == 'news' and not params.get('ids'):
+        if params.get('id'):
+            published = isinstance(result, dict) and result.get('moderation_status') == 'published'
+        else:
+            published = params.get('status', 'published') == 'published'
+        if published:
+            return PUBLIC_CACHE_CONTROL
+    return CACHE_CONTROL
+
+def record_timestamp(result: Any, keys: tuple = ('updated_at', 'created_at')) -> Optional[datetime]:
+    if not isinstance(result, dict) or 'items' in result:
+        return None
+    stamps = [result.get(key) for key in keys if isinstance(result.get(key), datetime)]
+    return max(stamps) if stamps else None
+
+def conditional_get(event: Dict[str, Any], response: Dict[str, Any], last_modified: Optional[datetime] = None,
+                    cache_control: str = CACHE_CONTROL) -> Dict[str, Any]:
+    request_headers = {str(key).lower(): value for key, value in (event.get('headers') or {}).items()}
+    etag = '"' + hashlib.sha256(response['body'].encode('utf-8')).hexdigest()[:32] + '"'
+    headers = dict(response['headers'])
+    headers['ETag'] = etag
+    headers['Cache-Control'] = cache_control
+    headers['Access-Control-Expose-Headers'] = 'ETag, Last-Modified, X-Next-Cursor'
+    
+    if last_modified and last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    if last_modified:
+        headers['Last-Modified'] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    
+    not_modified = False
+    if_none_match = request_headers.get('if-none-match')
+    if if_none_match is not None:
+        client_tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        not_modified = etag in client_tags or '*' in client_tags
+    elif last_modified and request_headers.get('if-modified-since'):
+        try:
+            not_modified = last_modified.replace(microsecond=0) <= parsedate_to_datetime(request_headers['if-modified-since'])
+        except (TypeError, ValueError):
+            not_modified = False
+    
+    if not_modified:
+        return {'statusCode': 304, 'headers': headers, 'body': '', 'isBase64Encoded': False}
+    return {**response, 'headers': headers}
+
+def encode_cursor(row: Dict) -> str:
+    published = row['published_date']
+    payload = json.dumps([published.isoformat() if isinstance(published, datetime) else str(published), row['id']])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        published, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        row_id = int(row_id)
+        published = datetime.fromisoformat(published)
+    except (ValueError, TypeError, OverflowError, binascii.Error):
+        raise BadRequest('Invalid cursor')
+    if not 0 < row_id <= 2147483647:
+        raise BadRequest('Invalid cursor')
+    return published, row_id
 
-def get_news_list(cur, params: Dict) -> List[Dict]:
+NEWS_FEED_COLUMNS = """
+    f.news_id as id, f.title, f.category_code, f.category_label, f.time_label, f.image_url,
+    f.description, f.source_url, f.created_at, f.published_date, 'published' as moderation_status
+"""
+
+def get_news_list(cur, params: Dict) -> Any:
     category = params.get('category')
     status = params.get('status', 'published')
-    limit = int(params.get('limit', 50))
-    offset = int(params.get('offset', 0))
+    limit = int_param(params, 'limit', 50, 1, 200)
+    offset = int_param(params, 'offset', 0, 0, 1000000)
+    cursor = params.get('cursor')
+    embed = params.get('embed') in ('1', 'true')
+    # Site reads of published cards come from the trigger-maintained news_feed; admin screens (fresh=1) and embeds need full rows
+    use_feed = status == 'published' and not embed and params.get('fresh') not in ('1', 'true')
+    alias, id_column = ('f', 'f.news_id') if use_feed else ('n', 'n.id')
     
-    where_clauses = [f"moderation_status = {sql_escape(status)}"]
+    where_clauses = [] if use_feed else [f"n.moderation_status = {sql_escape(status)}"]
     
     if category:
-        where_clauses.append(f"category_code = {sql_escape(category)}")
+        where_clauses.append(f"{alias}.category_code = {sql_escape(category)}")
     
-    where_sql = " AND ".join(where_clauses)
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        where_clauses.append(
+            f"({alias}.published_date, {id_column}) < ({sql_escape(cursor_date.isoformat())}::timestamp, {cursor_id})"
+        )
     
-    query = f"""
-        SELECT n.*, c.label as category_label
-        FROM t_p58513026_news_portal_creation.news n
-        LEFT JOIN t_p58513026_news_portal_creation.categories c ON n.category_code = c.code
-        WHERE {where_sql}
-        ORDER BY n.published_date DESC, n.id DESC
-        LIMIT {limit} OFFSET {offset}
-    """
+    where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    page_sql = f"LIMIT {limit + 1}" if cursor is not None else f"LIMIT {limit} OFFSET {offset}"
+    
+    if use_feed:
+        query = f"""
+            SELECT {NEWS_FEED_COLUMNS}
+            FROM t_p58513026_news_portal_creation.news_feed f
+            {where_sql}
+            ORDER BY f.published_date DESC, f.news_id DESC
+            {page_sql}
+        """
+    else:
+        query = f"""
+            SELECT n.*, c.label as category_label
+            FROM t_p58513026_news_portal_creation.news n
+            LEFT JOIN t_p58513026_news_portal_creation.categories c ON n.category_code = c.code
+            {where_sql}
+            ORDER BY n.published_date DESC, n.id DESC
+            {page_sql}
+        """
     
     cur.execute(query)
-    return cur.fetchall()
+    rows = cur.fetchall()
+    
+    if embed:
+        attach_news_children(cur, rows)
+    
+    if cursor is None:
+        return rows
+    
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+    return {'items': items, 'next_cursor': next_cursor}
+
+NEWS_CHILDREN_COLUMNS = """
+    COALESCE(img.images, '[]'::json) as images,
+    COALESCE(lnk.links, '[]'::json) as links,
+    COALESCE(tg.tags, ARRAY[]::varchar[]) as tags
+"""
+
+NEWS_CHILDREN_JOINS = """
+    LEFT JOIN LATERAL (
+        SELECT json_agg(i ORDER BY i.position, i.id) as images
+        FROM t_p58513026_news_portal_creation.news_images i
+        WHERE i.news_id = n.id
+    ) img ON true
+    LEFT JOIN LATERAL (
+        SELECT json_agg(l ORDER BY l.position, l.id) as links
+        FROM t_p58513026_news_portal_creation.news_links l
+        WHERE l.news_id = n.id
+    ) lnk ON true
+    LEFT JOIN LATERAL (
+        SELECT array_agg(t.tag ORDER BY t.id) as tags
+        FROM t_p58513026_news_portal_creation.news_tags t
+        WHERE t.news_id = n.id
+    ) tg ON true
+"""
+
+def parse_id_list(raw: Any, limit: int = ID_LIST_MAX) -> List[int]:
+    if isinstance(raw, str):
+        raw = raw.split(',')
+    try:
+        ids = list(dict.fromkeys(int(value) for value in raw if str(value).strip()))
+    except (TypeError, ValueError):
+        raise BadRequest('ids must be a comma-separated list of integers')
+    if len(ids) > limit:
+        raise BadRequest(f'At most {limit} ids per request, got {len(ids)}')
+    return ids
 
 def get_news_detail(cur, news_id: str) -> Dict:
     query = f"""
-        SELECT n.*, c.label as category_label
+        SELECT n.*, c.label as category_label, {NEWS_CHILDREN_COLUMNS}
         FROM t_p58513026_news_portal_creation.news n
         LEFT JOIN t_p58513026_news_portal_creation.categories c ON n.category_code = c.code
+        {NEWS_CHILDREN_JOINS}
         WHERE n.id = {sql_escape(news_id)}
     """
     cur.execute(query)
@@ -173,29 +603,109 @@ def get_news_detail(cur, news_id: str) -> Dict:
     if not news:
         return {'error': 'News not found'}
     
-    cur.execute(f"""
-        SELECT * FROM t_p58513026_news_portal_creation.news_images
-        WHERE news_id = {sql_escape(news_id)} ORDER BY position
-    """)
-    news['images'] = cur.fetchall()
+    return news
+
+SEARCH_HEADLINE_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10, FragmentDelimiter=" … "'
+
+def encode_search_cursor(row: Dict) -> str:
+    payload = json.dumps([float(row['rank']), row['id']])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_search_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        rank, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        rank, row_id = float(rank), int(row_id)
+    except (ValueError, TypeError, OverflowError, binascii.Error):
+        raise BadRequest('Invalid cursor')
+    if not math.isfinite(rank) or not 0 < row_id <= 2147483647:
+        raise BadRequest('Invalid cursor')
+    return rank, row_id
+
+def search_news(cur, params: Dict) -> Dict:
+    search_query = (params.get('q') or '').strip()
+    if not search_query:
+        return {'error': 'Search query is required'}
     
-    cur.execute(f"""
-        SELECT * FROM t_p58513026_news_portal_creation.news_links
-        WHERE news_id = {sql_escape(news_id)} ORDER BY position
-    """)
-    news['links'] = cur.fetchall()
+    limit = int_param(params, 'limit', 20, 1, 100)
+    cursor = params.get('cursor')
+    tsquery = f"websearch_to_tsquery('russian', {sql_escape(search_query)})"
+    
+    where_clauses = ["n.search_vector @@ q"]
+    if params.get('status'):
+        where_clauses.append(f"n.moderation_status = {sql_escape(params['status'])}")
+    if params.get('category'):
+        where_clauses.append(f"n.category_code = {sql_escape(params['category'])}")
+    if cursor:
+        cursor_rank, cursor_id = decode_search_cursor(cursor)
+        where_clauses.append(f"(ts_rank_cd(n.search_vector, q), n.id) < ({cursor_rank}::real, {cursor_id})")
+    
+    query = f"""
+        WITH matches AS (
+            SELECT n.id, ts_rank_cd(n.search_vector, q) as rank
+            FROM t_p58513026_news_portal_creation.news n, {tsquery} q
+            WHERE {' AND '.join(where_clauses)}
+            ORDER BY rank DESC, n.id DESC
+            LIMIT {limit + 1}
+        )
+        SELECT n.id, n.title, n.category_code, n.moderation_status, n.published_date, n.image_url, m.rank,
+               ts_headline('russian', n.title, q, 'StartSel=<mark>, StopSel=</mark>, HighlightAll=true') as title_highlight,
+               ts_headline('russian',
+                           COALESCE(n.description, '') || ' ' || regexp_replace(COALESCE(n.content, ''), '<[^>]+>', ' ', 'g'),
+                           q, {sql_escape(SEARCH_HEADLINE_OPTIONS)}) as snippet
+        FROM matches m
+        JOIN t_p58513026_news_portal_creation.news n ON n.id = m.id, {tsquery} q
+        ORDER BY m.rank DESC, m.id DESC
+    """
+    cur.execute(query)
+    rows = cur.fetchall()
     
+    items = rows[:limit]
+    next_cursor = encode_search_cursor(items[-1]) if len(rows) > limit else None
+    return {'items': items, 'next_cursor': next_cursor}
+
+def get_news_detail_batch(cur, news_ids: List[int]) -> List[Dict]:
+    if not news_ids:
+        return []
+    
+    ids_sql = f"ARRAY[{', '.join(str(int(news_id)) for news_id in news_ids)}]::int[]"
+    query = f"""
+        SELECT n.*, c.label as category_label, {NEWS_CHILDREN_COLUMNS}
+        FROM t_p58513026_news_portal_creation.news n
+        LEFT JOIN t_p58513026_news_portal_creation.categories c ON n.category_code = c.code
+        {NEWS_CHILDREN_JOINS}
+        WHERE n.id = ANY({ids_sql})
+        ORDER BY array_position({ids_sql}, n.id)
+    """
+    cur.execute(query)
+    return cur.fetchall()
+
+def attach_news_children(cur, rows: List[Dict]) -> List[Dict]:
+    if not rows:
+        return rows
+    
+    ids_sql = f"ARRAY[{', '.join(str(int(row['id'])) for row in rows)}]::int[]"
     cur.execute(f"""
-        SELECT tag FROM t_p58513026_news_portal_creation.news_tags
-        WHERE news_id = {sql_escape(news_id)}
+        SELECT n.id, {NEWS_CHILDREN_COLUMNS}
+        FROM t_p58513026_news_portal_creation.news n
+        {NEWS_CHILDREN_JOINS}
+        WHERE n.id = ANY({ids_sql})
     """)
-    news['tags'] = [row['tag'] for row in cur.fetchall()]
+    children = {row['id']: row for row in cur.fetchall()}
     
-    return news
+    for row in rows:
+        child = children.get(row['id'], {})
+        row['images'] = child.get('images', [])
+        row['links'] = child.get('links', [])
+        row['tags'] = child.get('tags', [])
+    return rows
 
-def get_categories(cur) -> List[Dict]:
-    cur.execute("SELECT * FROM t_p58513026_news_portal_creation.categories ORDER BY label")
-    return cur.fetchall()
+def get_categories() -> List[Dict]:
+    def load(cur) -> List[Dict]:
+        cur.execute("SELECT * FROM t_p58513026_news_portal_creation.categories ORDER BY label")
+        return [dict(row) for row in cur.fetchall()]
+    
+    return list(lookup_cache.get_or_load(('categories',), lambda: with_db_cursor(load)))
 
 def get_stats(cur) -> Dict:
     cur.execute("SELECT COUNT(*) as total FROM t_p58513026_news_portal_creation.news")
@@ -210,11 +720,39 @@ def get_stats(cur) -> Dict:
     
     return {'total': total, 'by_status': by_status}
 
+def insert_news_children(cur, news_id: int, data: Dict) -> None:
+    if data.get('images'):
+        execute_values(cur, """
+            INSERT INTO t_p58513026_news_portal_creation.news_images 
+            (news_id, image_url, caption, position)
+            VALUES %s
+        """, [(news_id, img.get('url', ''), img.get('caption', ''), idx) for idx, img in enumerate(data['images'])])
+    
+    if data.get('links'):
+        execute_values(cur, """
+            INSERT INTO t_p58513026_news_portal_creation.news_links 
+            (news_id, title, url, position)
+            VALUES %s
+        """, [(news_id, link.get('title', ''), link.get('url', ''), idx) for idx, link in enumerate(data['links'])])
+    
+    if data.get('tags'):
+        execute_values(cur, """
+            INSERT INTO t_p58513026_news_portal_creation.news_tags (news_id, tag)
+            VALUES %s
+        """, [(news_id, tag) for tag in data['tags']])
+
+def replace_news_children(cur, news_id: int, data: Dict) -> None:
+    tables = {'images': 'news_images', 'links': 'news_links', 'tags': 'news_tags'}
+    for key, table in tables.items():
+        if key in data:
+            cur.execute(f"DELETE FROM t_p58513026_news_portal_creation.{table} WHERE news_id = %s", (news_id,))
+    insert_news_children(cur, news_id, {key: data[key] for key in tables if key in data})
+
 def create_news(conn, cur, data: Dict) -> Dict:
     query = f"""
         INSERT INTO t_p58513026_news_portal_creation.news 
         (title, category_code, time_label, image_url, description, content, author, 
-         source_url, video_url, priority, moderation_status, seo_title, seo_description, seo_keywords)
+         source_url, video_url, priority, moderation_status, seo_title, seo_description, seo_keywords, simhash)
         VALUES (
             {sql_escape(data.get('title', ''))},
             {sql_escape(data.get('category_code', ''))},
@@ -229,38 +767,46 @@ def create_news(conn, cur, data: Dict) -> Dict:
             {sql_escape(data.get('moderation_status', 'published'))},
             {sql_escape(data.get('seo_title', ''))},
             {sql_escape(data.get('seo_description', ''))},
-            {sql_escape(data.get('seo_keywords', ''))}
+            {sql_escape(data.get('seo_keywords', ''))},
+            {news_fingerprint(data.get('title', ''), data.get('description', ''))}
         )
-        RETURNING id
+        ON CONFLICT (source_url) WHERE source_url <> '' DO UPDATE SET
+            title = EXCLUDED.title,
+            category_code = EXCLUDED.category_code,
+            time_label = EXCLUDED.time_label,
+            image_url = EXCLUDED.image_url,
+            description = EXCLUDED.description,
+            content = EXCLUDED.content,
+            author = EXCLUDED.author,
+            video_url = EXCLUDED.video_url,
+            priority = EXCLUDED.priority,
+            moderation_status = EXCLUDED.moderation_status,
+            seo_title = EXCLUDED.seo_title,
+            seo_description = EXCLUDED.seo_description,
+            seo_keywords = EXCLUDED.seo_keywords,
+            simhash = EXCLUDED.simhash,
+            updated_at = NOW()
+        WHERE news.moderation_status = 'draft'
+        RETURNING id, (xmax = 0) AS inserted
     """
     cur.execute(query)
-    news_id = cur.fetchone()['id']
+    row = cur.fetchone()
+    if row is None:
+        cur.execute(f"""
+            SELECT id FROM t_p58513026_news_portal_creation.news
+            WHERE source_url = {sql_escape(data.get('source_url', ''))}
+        """)
+        existing = cur.fetchone()
+        raise Conflict('News with this source_url already exists and is not a draft', existing['id'] if existing else None)
+    news_id = row['id']
     
-    if data.get('images'):
-        for idx, img in enumerate(data['images']):
-            cur.execute(f"""
-                INSERT INTO t_p58513026_news_portal_creation.news_images 
-                (news_id, image_url, caption, position)
-                VALUES ({news_id}, {sql_escape(img.get('url', ''))}, {sql_escape(img.get('caption', ''))}, {idx})
-            """)
-    
-    if data.get('links'):
-        for idx, link in enumerate(data['links']):
-            cur.execute(f"""
-                INSERT INTO t_p58513026_news_portal_creation.news_links 
-                (news_id, title, url, position)
-                VALUES ({news_id}, {sql_escape(link.get('title', ''))}, {sql_escape(link.get('url', ''))}, {idx})
-            """)
-    
-    if data.get('tags'):
-        for tag in data['tags']:
-            cur.execute(f"""
-                INSERT INTO t_p58513026_news_portal_creation.news_tags (news_id, tag)
-                VALUES ({news_id}, {sql_escape(tag)})
-            """)
+    if row['inserted']:
+        insert_news_children(cur, news_id, data)
+    else:
+        replace_news_children(cur, news_id, data)
     
     conn.commit()
-    return {'id': news_id, 'success': True}
+    return {'id': news_id, 'success': True, 'updated': not row['inserted']}
 
 def update_news(conn, cur, news_id: str, data: Dict) -> Dict:
     fields = []
@@ -304,6 +850,16 @@ def update_news(conn, cur, news_id: str, data: Dict) -> Dict:
         WHERE id = {sql_escape(news_id)}
     """
     cur.execute(query)
+    if 'title' in data or 'description' in data:
+        cur.execute(f"SELECT title, description FROM t_p58513026_news_portal_creation.news WHERE id = {sql_escape(news_id)}")
+        current = cur.fetchone()
+        if current:
+            cur.execute(f"""
+                UPDATE t_p58513026_news_portal_creation.news
+                SET simhash = {news_fingerprint(current['title'], current['description'])}
+                WHERE id = {sql_escape(news_id)}
+            """)
+    replace_news_children(cur, int(news_id), data)
     conn.commit()
     
     return {'success': True}
@@ -326,143 +882,748 @@ def create_category(conn, cur, data: Dict) -> Dict:
     cur.execute(query)
     code = cur.fetchone()['code']
     conn.commit()
+    lookup_cache.invalidate('categories')
     
     return {'code': code, 'success': True}
 
-def import_globalmsk_news(conn, cur, limit: int = 20) -> List[Dict]:
-    url = "https://www.globalmsk.ru/"
-    response = requests.get(url, timeout=10)
-    response.encoding = 'utf-8'
-    soup = BeautifulSoup(response.text, 'html.parser')
+NEAR_DUP_MAX_DISTANCE = int(os.environ.get('NEAR_DUP_MAX_DISTANCE', '6'))
+NEAR_DUP_WINDOW_DAYS = int(os.environ.get('NEAR_DUP_WINDOW_DAYS', '3'))
+NEAR_DUP_INDEX_REBUILD_SECONDS = float(os.environ.get('NEAR_DUP_INDEX_REBUILD_SECONDS', '3600'))
+NEAR_DUP_INDEX_OVERLAP_SECONDS = int(os.environ.get('NEAR_DUP_INDEX_OVERLAP_SECONDS', '300'))
+SIMHASH_BANDS = NEAR_DUP_MAX_DISTANCE + 1
+SIMHASH_BAND_BITS = 64 // SIMHASH_BANDS
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+def simhash(text: str) -> int:
+    tokens = TOKEN_RE.findall(text.lower())
+    features = [f"{tokens[i]} {tokens[i + 1]}" for i in range(len(tokens) - 1)] or tokens
+    if not features:
+        return 0
+    
+    weights = [0] * 64
+    for feature in features:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+def news_fingerprint(title: Optional[str], description: Optional[str]) -> int:
+    value = simhash(f"{title or ''} {description or ''}")
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+class SimHashIndex:
+    def __init__(self, max_distance: int = NEAR_DUP_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self._bands: List[Dict[int, List[tuple]]] = [{} for _ in range(SIMHASH_BANDS)]
     
-    imported_news = []
-    news_items = soup.find_all('a', class_='news_roll_item', limit=limit)
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        unsigned = fingerprint & ((1 << 64) - 1)
+        mask = (1 << SIMHASH_BAND_BITS) - 1
+        return [(unsigned >> (band * SIMHASH_BAND_BITS)) & mask for band in range(SIMHASH_BANDS)]
     
-    for item in news_items:
+    def add(self, key: Any, fingerprint: int) -> None:
+        for band, band_key in enumerate(self._band_keys(fingerprint)):
+            self._bands[band].setdefault(band_key, []).append((key, fingerprint))
+    
+    def find(self, fingerprint: int) -> Optional[Any]:
+        for band, band_key in enumerate(self._band_keys(fingerprint)):
+            for key, candidate in self._bands[band].get(band_key, ()):
+                if bin((candidate ^ fingerprint) & ((1 << 64) - 1)).count('1') <= self.max_distance:
+                    return key
+        return None
+
+_fingerprint_window: Dict[str, Any] = {'index': None, 'ids': set(), 'watermark': None, 'built_at': 0.0}
+_fingerprint_window_lock = threading.Lock()
+
+def backfill_fingerprints(cur) -> List[tuple]:
+    cur.execute(f"""
+        SELECT id, title, description
+        FROM t_p58513026_news_portal_creation.news
+        WHERE simhash IS NULL AND created_at > NOW() - INTERVAL '{NEAR_DUP_WINDOW_DAYS} days'
+    """)
+    missing = [(row['id'], news_fingerprint(row['title'], row['description'])) for row in cur.fetchall()]
+    if missing:
+        execute_values(cur, """
+            UPDATE t_p58513026_news_portal_creation.news
+            SET simhash = v.simhash
+            FROM (VALUES %s) AS v(id, simhash)
+            WHERE news.id = v.id
+        """, missing, page_size=len(missing))
+    return missing
+
+def load_recent_fingerprints(cur) -> SimHashIndex:
+    with _fingerprint_window_lock:
+        window = _fingerprint_window
+        if window['index'] is None or time.monotonic() - window['built_at'] > NEAR_DUP_INDEX_REBUILD_SECONDS:
+            window.update(index=SimHashIndex(), ids=set(), watermark=None, built_at=time.monotonic())
+        
+        if window['watermark'] is None:
+            since_sql = f"NOW() - INTERVAL '{NEAR_DUP_WINDOW_DAYS} days'"
+        else:
+            since_sql = f"{sql_escape(window['watermark'].isoformat())}::timestamp - INTERVAL '{NEAR_DUP_INDEX_OVERLAP_SECONDS} seconds'"
+        cur.execute(f"""
+            SELECT id, simhash, created_at
+            FROM t_p58513026_news_portal_creation.news
+            WHERE created_at > {since_sql}
+        """)
+        rows = [(row['id'], row['simhash'], row['created_at']) for row in cur.fetchall()]
+        rows.extend((news_id, fingerprint, None) for news_id, fingerprint in backfill_fingerprints(cur))
+        
+        for news_id, fingerprint, created_at in rows:
+            if created_at is not None and (window['watermark'] is None or created_at > window['watermark']):
+                window['watermark'] = created_at
+            if fingerprint and news_id not in window['ids']:
+                window['ids'].add(news_id)
+                window['index'].add(news_id, fingerprint)
+        return window['index']
+
+def drop_near_duplicates(cur, items: List[Dict]) -> tuple:
+    index = load_recent_fingerprints(cur)
+    batch = SimHashIndex()
+    unique_items = []
+    near_duplicates = []
+    
+    for item in items:
+        item['simhash'] = news_fingerprint(item['title'], item.get('description'))
+        duplicate_of = None
+        if item['simhash']:
+            duplicate_of = index.find(item['simhash'])
+            if duplicate_of is None:
+                duplicate_of = batch.find(item['simhash'])
+        if duplicate_of is not None:
+            near_duplicates.append({'title': item['title'], 'source_url': item['source_url'], 'duplicate_of': duplicate_of})
+            continue
+        if item['simhash']:
+            batch.add(item['source_url'], item['simhash'])
+        unique_items.append(item)
+    
+    return unique_items, near_duplicates
+
+IMPORT_COLUMNS = ['title', 'description', 'category_code', 'time_label', 'image_url', 'source_url', 'author', 'moderation_status', 'simhash']
+
+def bulk_insert_imported_news(cur, items: List[Dict]) -> List[Dict]:
+    unique_items = list({item['source_url']: item for item in items}.values())
+    if not unique_items:
+        return []
+    
+    rows = execute_values(cur, f"""
+        INSERT INTO t_p58513026_news_portal_creation.news 
+        ({', '.join(IMPORT_COLUMNS)})
+        VALUES %s
+        ON CONFLICT (source_url) WHERE source_url <> '' DO NOTHING
+        RETURNING id, title, description, category_code, time_label, image_url, source_url
+    """, [tuple(item.get(column, '') for column in IMPORT_COLUMNS) for item in unique_items],
+        page_size=len(unique_items), fetch=True)
+    return [dict(row) for row in rows]
+
+def import_result(items: List[Dict], inserted: List[Dict]) -> Dict:
+    return {
+        'success': True,
+        'news': inserted,
+        'count': len(inserted),
+        'inserted': len(inserted),
+        'skipped': len(items) - len(inserted)
+    }
+
+GLOBALMSK_RULES = {
+    'region_start': 'news_roll_item',
+    'region_end': None,
+    'item': 'a.news_roll_item',
+    'fields': {
+        'source_url': '@href',
+        'title': 'div.nr_title',
+        'image_url': 'img@src',
+        'time_label': 'div.nr_info_block_time',
+        'category_code': 'a.nr_info_block_rub@href'
+    },
+    'absolute': ['source_url', 'image_url'],
+    'last_segment': ['category_code']
+}
+
+DEFAULT_IMPORT_FEEDS = [
+    {'name': 'globalmsk-html', 'type': 'html', 'url': 'https://www.globalmsk.ru/', 'base_url': 'https://www.globalmsk.ru', 'author': 'GlobalMsk.ru', 'rules': GLOBALMSK_RULES},
+    {'name': 'globalmsk-rss', 'type': 'rss', 'url': 'https://globalmsk.ru/dzen.php', 'author': 'GlobalMsk.ru'}
+]
+
+IMPORT_FEEDS: List[Dict] = json.loads(os.environ.get('IMPORT_FEEDS') or json.dumps(DEFAULT_IMPORT_FEEDS))
+IMPORT_MAX_WORKERS = int(os.environ.get('IMPORT_MAX_WORKERS', '8'))
+IMPORT_PER_HOST_CONCURRENCY = int(os.environ.get('IMPORT_PER_HOST_CONCURRENCY', '2'))
+IMPORT_TIMEOUT = float(os.environ.get('IMPORT_TIMEOUT', '10'))
+RSS_CHUNK_SIZE = int(os.environ.get('RSS_CHUNK_SIZE', '16384'))
+IMPORT_CATCHUP_MAX_ITEMS = int(os.environ.get('IMPORT_CATCHUP_MAX_ITEMS', '500'))
+# 'region' parses only the slice after rules['region_start'] and stays opt-in until it is measured on saved production pages
+SCRAPE_BACKEND = os.environ.get('SCRAPE_BACKEND', 'lxml')
+IMPORT_WORKER_CONCURRENCY = int(os.environ.get('IMPORT_WORKER_CONCURRENCY', '2'))
+IMPORT_WORKER_MAX_SECONDS = float(os.environ.get('IMPORT_WORKER_MAX_SECONDS', '50'))
+IMPORT_JOB_MAX_ATTEMPTS = int(os.environ.get('IMPORT_JOB_MAX_ATTEMPTS', '3'))
+IMPORT_JOB_BACKOFF_SECONDS = float(os.environ.get('IMPORT_JOB_BACKOFF_SECONDS', '30'))
+IMPORT_JOB_LOCK_TIMEOUT = int(os.environ.get('IMPORT_JOB_LOCK_TIMEOUT', '600'))
+IMPORT_MAX_LIMIT = int(os.environ.get('IMPORT_MAX_LIMIT', '50'))
+
+http_session = requests.Session()
+_host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_host_semaphores_lock = threading.Lock()
+
+def host_semaphore(url: str) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc.lower()
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(IMPORT_PER_HOST_CONCURRENCY)
+        return _host_semaphores[host]
+
+@contextmanager
+def fetch_feed(url: str, headers: Optional[Dict[str, str]] = None) -> Iterator[requests.Response]:
+    with host_semaphore(url):
+        response = http_session.get(url, headers=headers or {}, timeout=IMPORT_TIMEOUT, stream=True)
         try:
-            source_url = 'https://www.globalmsk.ru' + item.get('href', '')
-            title_elem = item.find('div', class_='nr_title')
-            title = title_elem.text.strip() if title_elem else ''
-            
-            if not title:
-                continue
-            
-            query = f"SELECT COUNT(*) as count FROM t_p58513026_news_portal_creation.news WHERE source_url = {sql_escape(source_url)}"
-            cur.execute(query)
-            if cur.fetchone()['count'] > 0:
+            response.raise_for_status()
+            response.encoding = 'utf-8'
+            yield response
+        finally:
+            response.close()
+
+_compiled_rules: Dict[str, Dict] = {}
+
+def selector_parts(selector: str) -> tuple:
+    element, _, attr = selector.partition('@')
+    tag, _, css_class = element.partition('.')
+    return element, tag, css_class, attr
+
+def selector_xpath(selector: str) -> str:
+    element, tag, css_class, attr = selector_parts(selector)
+    path = '.'
+    if element:
+        path = f".//{tag or '*'}"
+        if css_class:
+            path += f"[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]"
+    if attr:
+        return f"string(({path})[1]/@{attr})"
+    return f"normalize-space(({path})[1])"
+
+def compile_rules(rules: Dict) -> Dict:
+    key = json.dumps(rules, sort_keys=True)
+    if key not in _compiled_rules:
+        _, tag, css_class, _ = selector_parts(rules['item'])
+        item_path = f"//{tag or '*'}"
+        if css_class:
+            item_path += f"[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]"
+        _compiled_rules[key] = {
+            'item': lxml_etree.XPath(item_path),
+            'fields': {name: lxml_etree.XPath(selector_xpath(selector)) for name, selector in rules['fields'].items()}
+        }
+    return _compiled_rules[key]
+
+def extract_region(html: str, rules: Dict) -> str:
+    start = html.find(rules['region_start']) if rules.get('region_start') else -1
+    if start == -1:
+        return html
+    start = html.rfind('<', 0, start)
+    end = html.find(rules['region_end'], start) if rules.get('region_end') else -1
+    return html[start:end] if end != -1 else html[start:]
+
+def scrape_lxml(html: str, rules: Dict, limit: int, region_only: bool = False) -> Iterator[Dict[str, str]]:
+    compiled = compile_rules(rules)
+    source = extract_region(html, rules) if region_only else html
+    if not source.strip():
+        return
+    root = lxml.html.fromstring(source)
+    for item in compiled['item'](root)[:limit]:
+        yield {name: str(xpath(item)).strip() for name, xpath in compiled['fields'].items()}
+
+def scrape_bs4(html: str, rules: Dict, limit: int) -> Iterator[Dict[str, str]]:
+    soup = BeautifulSoup(html, 'html.parser')
+    _, item_tag, item_class, _ = selector_parts(rules['item'])
+    
+    for item in soup.find_all(item_tag or True, class_=item_class or None, limit=limit):
+        fields = {}
+        for name, selector in rules['fields'].items():
+            element, tag, css_class, attr = selector_parts(selector)
+            target = item.find(tag or True, class_=css_class or None) if element else item
+            if target is None:
+                fields[name] = ''
+            else:
+                fields[name] = (target.get(attr, '') if attr else target.get_text()).strip()
+        yield fields
+
+SCRAPE_BACKENDS: Dict[str, Callable[[str, Dict, int], Iterator[Dict[str, str]]]] = {
+    'bs4': scrape_bs4,
+    'lxml': lambda html, rules, limit: scrape_lxml(html, rules, limit),
+    'region': lambda html, rules, limit: scrape_lxml(html, rules, limit, region_only=True)
+}
+
+def parse_html_feed(response: requests.Response, feed: Dict, limit: int) -> Iterator[Dict]:
+    base_url = feed.get('base_url', '')
+    rules = feed.get('rules', GLOBALMSK_RULES)
+    scrape = SCRAPE_BACKENDS[feed.get('backend', SCRAPE_BACKEND)]
+    
+    for fields in scrape(response.text, rules, limit):
+        try:
+            if not fields.get('title') or not fields.get('source_url'):
                 continue
             
-            img_elem = item.find('img')
-            image_url = 'https://www.globalmsk.ru' + img_elem.get('src', '') if img_elem else ''
-            
-            time_elem = item.find('div', class_='nr_info_block_time')
-            time_label = time_elem.text.strip() if time_elem else 'Только что'
+            for name in rules.get('absolute', []):
+                if fields.get(name):
+                    fields[name] = urljoin(base_url + '/', fields[name])
             
-            cat_elem = item.find('a', class_='nr_info_block_rub')
-            category_code = cat_elem.get('href', '').split('/')[-1] if cat_elem else 'news'
+            for name in rules.get('last_segment', []):
+                if fields.get(name):
+                    fields[name] = fields[name].rstrip('/').split('/')[-1]
             
-            query = f"""
-                INSERT INTO t_p58513026_news_portal_creation.news 
-                (title, category_code, time_label, image_url, source_url, author, moderation_status)
-                VALUES (
-                    {sql_escape(title)},
-                    {sql_escape(category_code)},
-                    {sql_escape(time_label)},
-                    {sql_escape(image_url)},
-                    {sql_escape(source_url)},
-                    'GlobalMsk.ru',
-                    'draft'
-                )
-                RETURNING id, title, category_code, time_label, image_url
-            """
-            cur.execute(query)
-            result = cur.fetchone()
-            imported_news.append(dict(result))
+            yield {
+                'title': fields['title'],
+                'description': fields.get('description', ''),
+                'category_code': fields.get('category_code') or feed.get('category_code', 'news'),
+                'time_label': fields.get('time_label') or 'Только что',
+                'image_url': fields.get('image_url', ''),
+                'source_url': fields.get('source_url', ''),
+                'author': feed.get('author', ''),
+                'moderation_status': 'draft',
+                'guid': fields.get('source_url', '')
+            }
         
         except Exception as e:
             print(f"Error importing news: {e}")
             continue
+
+def iter_rss_items(response: requests.Response) -> Iterator[ET.Element]:
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack: List[ET.Element] = []
     
-    conn.commit()
-    return imported_news
+    for chunk in response.iter_content(chunk_size=RSS_CHUNK_SIZE):
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == 'start':
+                stack.append(elem)
+                continue
+            stack.pop()
+            if elem.tag == 'item':
+                yield elem
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
+    
+    parser.close()
 
-def import_rss_feed(conn, cur, limit: int = 20) -> List[Dict]:
-    rss_url = "https://globalmsk.ru/dzen.php"
-    response = requests.get(rss_url, timeout=10)
-    response.encoding = 'utf-8'
+def rss_item_to_news(item: ET.Element, feed: Dict) -> Optional[Dict]:
+    title = item.find('title').text if item.find('title') is not None else ''
+    source_url = item.find('link').text if item.find('link') is not None else ''
+    description = item.find('description').text if item.find('description') is not None else ''
+    
+    media_ns = '{http://search.yahoo.com/mrss/}'
+    media_content = item.find(f'{media_ns}content')
+    image_url = ''
+    if media_content is not None:
+        image_url = media_content.get('url', '')
+    
+    if not image_url:
+        enclosure = item.find('enclosure')
+        if enclosure is not None and enclosure.get('type', '').startswith('image'):
+            image_url = enclosure.get('url', '')
     
+    author_elem = item.find('author')
+    author = author_elem.text if author_elem is not None else feed.get('author', '')
+    
+    guid_elem = item.find('guid')
+    guid = guid_elem.text if guid_elem is not None and guid_elem.text else source_url
+    
+    pub_date_elem = item.find('pubDate')
     try:
-        root = ET.fromstring(response.content)
-    except:
-        root = ET.fromstring(response.text.encode('utf-8'))
+        pub_date = parsedate_to_datetime(pub_date_elem.text) if pub_date_elem is not None else None
+    except (TypeError, ValueError):
+        pub_date = None
+    if pub_date is not None and pub_date.tzinfo is not None:
+        pub_date = pub_date.astimezone(timezone.utc).replace(tzinfo=None)
     
-    imported_news = []
-    items = root.findall('.//item')[:limit]
+    if not title or not source_url:
+        return None
     
-    for item in items:
-        try:
-            title = item.find('title').text if item.find('title') is not None else ''
-            source_url = item.find('link').text if item.find('link') is not None else ''
-            description = item.find('description').text if item.find('description') is not None else ''
-            pub_date = item.find('pubDate').text if item.find('pubDate') is not None else ''
-            
-            media_ns = '{http://search.yahoo.com/mrss/}'
-            media_content = item.find(f'{media_ns}content')
-            image_url = ''
-            if media_content is not None:
-                image_url = media_content.get('url', '')
-            
-            if not image_url:
-                enclosure = item.find('enclosure')
-                if enclosure is not None and enclosure.get('type', '').startswith('image'):
-                    image_url = enclosure.get('url', '')
-            
-            author_elem = item.find('author')
-            author = author_elem.text if author_elem is not None else 'GlobalMsk.ru'
-            
-            if not title or not source_url:
+    return {
+        'title': title,
+        'description': description,
+        'image_url': image_url,
+        'source_url': source_url,
+        'author': author,
+        'time_label': 'Только что',
+        'category_code': feed.get('category_code', 'news'),
+        'moderation_status': 'draft',
+        'guid': guid,
+        'pub_date': pub_date
+    }
+
+def parse_rss_feed(response: requests.Response, feed: Dict, limit: int) -> Iterator[Dict]:
+    collected = 0
+    try:
+        for item in iter_rss_items(response):
+            try:
+                news = rss_item_to_news(item, feed)
+            except Exception as e:
+                print(f"Error importing RSS item: {e}")
                 continue
-            
-            query = f"SELECT COUNT(*) as count FROM t_p58513026_news_portal_creation.news WHERE source_url = {sql_escape(source_url)}"
-            cur.execute(query)
-            if cur.fetchone()['count'] > 0:
+            if news is None:
                 continue
-            
-            query = f"""
-                INSERT INTO t_p58513026_news_portal_creation.news 
-                (title, description, image_url, source_url, author, time_label, category_code, moderation_status)
-                VALUES (
-                    {sql_escape(title)},
-                    {sql_escape(description)},
-                    {sql_escape(image_url)},
-                    {sql_escape(source_url)},
-                    {sql_escape(author)},
-                    'Только что',
-                    'news',
-                    'draft'
-                )
-                RETURNING id, title, description, image_url, source_url
-            """
-            cur.execute(query)
-            result = cur.fetchone()
-            imported_news.append(dict(result))
+            yield news
+            collected += 1
+            if collected >= limit:
+                return
+    except ET.ParseError as e:
+        print(f"Error parsing RSS feed {feed['name']}: {e}")
+
+FEED_PARSERS: Dict[str, Callable[[requests.Response, Dict, int], Iterator[Dict]]] = {
+    'html': parse_html_feed,
+    'rss': parse_rss_feed
+}
+
+def load_feed_states(cur, feeds: List[Dict]) -> Dict[str, Dict]:
+    if not feeds:
+        return {}
+    names = ', '.join(sql_escape(feed['name']) for feed in feeds)
+    cur.execute(f"""
+        SELECT * FROM t_p58513026_news_portal_creation.import_feed_state
+        WHERE feed_name IN ({names})
+    """)
+    return {row['feed_name']: dict(row) for row in cur.fetchall()}
+
+def save_feed_states(cur, states: List[Dict]) -> None:
+    if not states:
+        return
+    execute_values(cur, """
+        INSERT INTO t_p58513026_news_portal_creation.import_feed_state
+        (feed_name, etag, last_modified, last_guid, last_pub_date, updated_at)
+        VALUES %s
+        ON CONFLICT (feed_name) DO UPDATE SET
+            etag = EXCLUDED.etag,
+            last_modified = EXCLUDED.last_modified,
+            last_guid = EXCLUDED.last_guid,
+            last_pub_date = EXCLUDED.last_pub_date,
+            updated_at = EXCLUDED.updated_at
+    """, [
+        (state['feed_name'], state.get('etag'), state.get('last_modified'),
+         state.get('last_guid'), state.get('last_pub_date'), datetime.utcnow())
+        for state in states
+    ])
+
+def collect_feed_items(feed: Dict, limit: int, state: Optional[Dict] = None) -> Dict:
+    state = state or {}
+    headers = {}
+    if state.get('etag'):
+        headers['If-None-Match'] = state['etag']
+    if state.get('last_modified'):
+        headers['If-Modified-Since'] = state['last_modified']
+    
+    last_guid = state.get('last_guid')
+    pending: deque = deque(maxlen=limit)
+    unseen = 0
+    with fetch_feed(feed['url'], headers) as response:
+        new_state = {
+            'feed_name': feed['name'],
+            'etag': response.headers.get('ETag', state.get('etag')),
+            'last_modified': response.headers.get('Last-Modified', state.get('last_modified')),
+            'last_guid': state.get('last_guid'),
+            'last_pub_date': state.get('last_pub_date')
+        }
         
-        except Exception as e:
-            print(f"Error importing RSS item: {e}")
-            continue
+        if response.status_code == 304:
+            return {'items': [], 'state': new_state, 'not_modified': True}
+        
+        for item in FEED_PARSERS[feed['type']](response, feed, IMPORT_CATCHUP_MAX_ITEMS if last_guid else limit):
+            if last_guid and item['guid'] == last_guid:
+                break
+            pending.append(item)
+            unseen += 1
+    
+    items = list(pending)
+    truncated = unseen > len(items)
+    if truncated:
+        new_state['etag'] = state.get('etag')
+        new_state['last_modified'] = state.get('last_modified')
+    if items:
+        new_state['last_guid'] = items[0]['guid']
+        new_state['last_pub_date'] = items[0].get('pub_date') or new_state['last_pub_date']
     
+    return {'items': items, 'state': new_state, 'not_modified': False, 'truncated': truncated}
+
+def import_feeds(conn, cur, feeds: List[Dict], limit: int = 20, force: bool = False) -> Dict:
+    items: List[Dict] = []
+    feed_stats: Dict[str, Dict] = {}
+    new_states: List[Dict] = []
+    errors: List[Dict] = []
+    started = time.monotonic()
+    states = {} if force else load_feed_states(cur, feeds)
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(IMPORT_MAX_WORKERS, len(feeds)))) as executor:
+        futures = {executor.submit(collect_feed_items, feed, limit, states.get(feed['name'])): feed for feed in feeds}
+        for future in as_completed(futures):
+            feed = futures[future]
+            try:
+                collected = future.result()
+            except Exception as e:
+                print(f"Error importing feed {feed['name']}: {e}")
+                errors.append({'feed': feed['name'], 'error': str(e)})
+                continue
+            feed_stats[feed['name']] = {
+                'parsed': len(collected['items']),
+                'not_modified': collected['not_modified'],
+                'truncated': collected.get('truncated', False)
+            }
+            new_states.append(collected['state'])
+            items.extend(collected['items'])
+    
+    unique_items, near_duplicates = drop_near_duplicates(cur, items)
+    inserted = bulk_insert_imported_news(cur, unique_items)
+    save_feed_states(cur, new_states)
     conn.commit()
-    return imported_news
+    
+    result = import_result(items, inserted)
+    result['near_duplicates'] = near_duplicates
+    result['feeds'] = feed_stats
+    result['errors'] = errors
+    result['elapsed_ms'] = round((time.monotonic() - started) * 1000, 1)
+    return result
 
-def get_banners_list(cur, placement: str = None) -> List[Dict]:
-    where_clause = f"WHERE placement = {sql_escape(placement)}" if placement else ""
-    query = f"""
+def select_feeds(names: Optional[str] = None, feed_type: Optional[str] = None) -> List[Dict]:
+    wanted = {name.strip() for name in names.split(',') if name.strip()} if names else None
+    return [
+        feed for feed in IMPORT_FEEDS
+        if (wanted is None or feed['name'] in wanted) and (feed_type is None or feed['type'] == feed_type)
+    ]
+
+def enqueue_import_jobs(conn, cur, feeds: List[Dict], limit: int = 20, force: bool = False) -> Dict:
+    jobs = []
+    for feed in feeds:
+        cur.execute(f"""
+            INSERT INTO t_p58513026_news_portal_creation.import_jobs (feed_name, limit_count, force, max_attempts)
+            VALUES ({sql_escape(feed['name'])}, {int(limit)}, {'true' if force else 'false'}, {IMPORT_JOB_MAX_ATTEMPTS})
+            ON CONFLICT (feed_name) WHERE status IN ('queued', 'running') DO NOTHING
+            RETURNING *
+        """)
+        job = cur.fetchone()
+        if job is None:
+            cur.execute(f"""
+                SELECT * FROM t_p58513026_news_portal_creation.import_jobs
+                WHERE feed_name = {sql_escape(feed['name'])} AND status IN ('queued', 'running')
+            """)
+            job = cur.fetchone()
+            if job is None:
+                continue
+            job = dict(job)
+            job['deduplicated'] = True
+        jobs.append(dict(job))
+    conn.commit()
+    
+    return {'success': True, 'queued': True, 'jobs': jobs, 'job_ids': [job['id'] for job in jobs]}
+
+def get_import_jobs(cur, params: Dict) -> Dict:
+    if params.get('ids'):
+        where_sql = f"WHERE id = ANY(ARRAY[{', '.join(str(job_id) for job_id in parse_id_list(params['ids']))}]::int[])"
+    else:
+        where_sql = ""
+    limit = int_param(params, 'limit', 20, 1, 100)
+    cur.execute(f"""
+        SELECT * FROM t_p58513026_news_portal_creation.import_jobs
+        {where_sql}
+        ORDER BY id DESC
+        LIMIT {limit}
+    """)
+    jobs = cur.fetchall()
+    
+    summary = {status: 0 for status in ('queued', 'running', 'done', 'failed')}
+    for job in jobs:
+        summary[job['status']] = summary.get(job['status'], 0) + 1
+    summary['total'] = len(jobs)
+    summary['finished'] = summary['done'] + summary['failed'] == len(jobs)
+    return {'jobs': jobs, 'summary': summary}
+
+def claim_import_job(conn, cur) -> Optional[Dict]:
+    cur.execute(f"""
+        UPDATE t_p58513026_news_portal_creation.import_jobs
+        SET status = 'running', attempts = attempts + 1, locked_at = NOW(),
+            started_at = COALESCE(started_at, NOW()), updated_at = NOW()
+        WHERE id = (
+            SELECT id FROM t_p58513026_news_portal_creation.import_jobs
+            WHERE (status = 'queued' AND run_after <= NOW())
+               OR (status = 'running' AND locked_at < NOW() - INTERVAL '{IMPORT_JOB_LOCK_TIMEOUT} seconds')
+            ORDER BY run_after, id
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING *
+    """)
+    job = cur.fetchone()
+    conn.commit()
+    return dict(job) if job else None
+
+def finish_import_job(conn, cur, job: Dict, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+    if error is None:
+        summary = {key: result[key] for key in ('inserted', 'skipped', 'feeds', 'errors', 'elapsed_ms') if key in result}
+        cur.execute(f"""
+            UPDATE t_p58513026_news_portal_creation.import_jobs
+            SET status = 'done', result = {sql_escape(json.dumps(summary, ensure_ascii=False, default=str))}::jsonb,
+                error = NULL, locked_at = NULL, finished_at = NOW(), updated_at = NOW()
+            WHERE id = {job['id']}
+        """)
+    elif job['attempts'] < job['max_attempts']:
+        backoff = IMPORT_JOB_BACKOFF_SECONDS * (2 ** (job['attempts'] - 1))
+        cur.execute(f"""
+            UPDATE t_p58513026_news_portal_creation.import_jobs
+            SET status = 'queued', error = {sql_escape(error)}, locked_at = NULL,
+                run_after = NOW() + INTERVAL '{backoff} seconds', updated_at = NOW()
+            WHERE id = {job['id']}
+        """)
+    else:
+        cur.execute(f"""
+            UPDATE t_p58513026_news_portal_creation.import_jobs
+            SET status = 'failed', error = {sql_escape(error)}, locked_at = NULL,
+                finished_at = NOW(), updated_at = NOW()
+            WHERE id = {job['id']}
+        """)
+    conn.commit()
+
+def run_import_job(conn, cur, job: Dict) -> None:
+    try:
+        feeds = select_feeds(job['feed_name'])
+        if not feeds:
+            raise ValueError(f"Unknown feed: {job['feed_name']}")
+        result = import_feeds(conn, cur, feeds, job['limit_count'], job['force'])
+        if result['errors'] and not result['feeds']:
+            raise RuntimeError(result['errors'][0]['error'])
+    except Exception as e:
+        if isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)) or conn.closed:
+            raise
+        conn.rollback()
+        print(f"Import job {job['id']} failed: {e}")
+        finish_import_job(conn, cur, job, error=str(e))
+        return
+    finish_import_job(conn, cur, job, result=result)
+
+def import_worker_loop(deadline: float) -> int:
+    processed = 0
+    conn = get_db_connection()
+    broken = False
+    try:
+        cur = conn.cursor()
+        while time.monotonic() < deadline:
+            job = claim_import_job(conn, cur)
+            if job is None:
+                break
+            run_import_job(conn, cur, job)
+            processed += 1
+        cur.close()
+    except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+        broken = True
+        print(f"Import worker lost its connection, running job is retried after the lock timeout: {e}")
+    finally:
+        release_db_connection(conn, broken)
+    return processed
+
+def run_import_worker(concurrency: int = 0, max_seconds: float = 0) -> Dict:
+    requested = concurrency or IMPORT_WORKER_CONCURRENCY
+    concurrency = max(1, min(requested, DB_POOL_MAX - 1))
+    if concurrency != requested:
+        print(f"Import worker concurrency {requested} capped at {concurrency} by DB_POOL_MAX={DB_POOL_MAX}")
+    deadline = time.monotonic() + (max_seconds or IMPORT_WORKER_MAX_SECONDS)
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        processed = sum(executor.map(import_worker_loop, [deadline] * concurrency))
+    
+    return {
+        'success': True,
+        'processed': processed,
+        'concurrency': concurrency,
+        'requested_concurrency': requested,
+        'capped': concurrency != requested
+    }
+
+def get_banners_list(placement: str = None) -> List[Dict]:
+    def load(cur) -> List[Dict]:
+        where_clause = f"WHERE placement = {sql_escape(placement)}" if placement else ""
+        query = f"""
+            SELECT * FROM t_p58513026_news_portal_creation.banners
+            {where_clause}
+            ORDER BY priority DESC, id DESC
+        """
+        cur.execute(query)
+        return [dict(row) for row in cur.fetchall()]
+    
+    return list(lookup_cache.get_or_load(('banners', placement or '*'), lambda: with_db_cursor(load)))
+
+BANNER_SLOT_MAX_COUNT = int(os.environ.get('BANNER_SLOT_MAX_COUNT', '10'))
+BANNER_INDEX_KEY = ('banners', '__index__')
+
+class BannerSlot:
+    def __init__(self, banners: List[Dict]):
+        self.banners = banners
+        weights = [max(banner.get('priority') or 0, 0) + 1 for banner in banners]
+        total = sum(weights)
+        scaled = [weight * len(banners) / total for weight in weights]
+        self.prob = [1.0] * len(banners)
+        self.alias = list(range(len(banners)))
+        small = [i for i, value in enumerate(scaled) if value < 1]
+        large = [i for i, value in enumerate(scaled) if value >= 1]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self.prob[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] -= 1 - scaled[low]
+            (small if scaled[high] < 1 else large).append(high)
+    
+    def pick(self) -> int:
+        i = random.randrange(len(self.banners))
+        return i if random.random() < self.prob[i] else self.alias[i]
+    
+    def choose(self, count: int) -> List[Dict]:
+        if count >= len(self.banners):
+            return list(self.banners)
+        chosen = []
+        for _ in range(count * 4):
+            i = self.pick()
+            if i not in chosen:
+                chosen.append(i)
+                if len(chosen) == count:
+                    break
+        for i in range(len(self.banners)):
+            if len(chosen) == count:
+                break
+            if i not in chosen:
+                chosen.append(i)
+        return [self.banners[i] for i in chosen]
+
+def build_banner_index(cur) -> Dict[str, BannerSlot]:
+    cur.execute("""
         SELECT * FROM t_p58513026_news_portal_creation.banners
-        {where_clause}
+        WHERE is_active
         ORDER BY priority DESC, id DESC
-    """
-    cur.execute(query)
-    return cur.fetchall()
+    """)
+    by_placement: Dict[str, List[Dict]] = {}
+    for row in cur.fetchall():
+        by_placement.setdefault(row['placement'], []).append(dict(row))
+    return {placement: BannerSlot(banners) for placement, banners in by_placement.items()}
+
+def refresh_banner_index(cur) -> None:
+    lookup_cache.invalidate('banners')
+    lookup_cache.set(BANNER_INDEX_KEY, build_banner_index(cur))
+
+def parse_placement_counts(raw: str, default_count: int) -> Dict[str, int]:
+    counts = {}
+    for part in raw.split(','):
+        placement, _, count = part.strip().partition(':')
+        if placement:
+            try:
+                value = int(count) if count else default_count
+            except ValueError:
+                raise BadRequest(f'count for {placement} must be an integer')
+            counts[placement] = max(1, min(value, BANNER_SLOT_MAX_COUNT))
+    return counts
+
+def select_banners(params: Dict) -> Dict:
+    counts = parse_placement_counts(params.get('placements') or params.get('placement', ''), int_param(params, 'count', 1, 1, BANNER_SLOT_MAX_COUNT))
+    index = lookup_cache.get_or_load(BANNER_INDEX_KEY, lambda: with_db_cursor(build_banner_index))
+    return {
+        'placements': {
+            placement: index[placement].choose(count) if placement in index else []
+            for placement, count in counts.items()
+        }
+    }
 
 def get_banner_detail(cur, banner_id: str) -> Dict:
     query = f"SELECT * FROM t_p58513026_news_portal_creation.banners WHERE id = {sql_escape(banner_id)}"
@@ -489,6 +1650,7 @@ def create_banner(conn, cur, data: Dict) -> Dict:
     cur.execute(query)
     banner_id = cur.fetchone()['id']
     conn.commit()
+    refresh_banner_index(cur)
     return {'id': banner_id, 'success': True}
 
 def update_banner(conn, cur, banner_id: str, data: Dict) -> Dict:
@@ -522,10 +1684,15 @@ def update_banner(conn, cur, banner_id: str, data: Dict) -> Dict:
     """
     cur.execute(query)
     conn.commit()
+    refresh_banner_index(cur)
     return {'success': True}
 
 def delete_banner(conn, cur, banner_id: str) -> Dict:
     query = f"DELETE FROM t_p58513026_news_portal_creation.banners WHERE id = {sql_escape(banner_id)}"
     cur.execute(query)
     conn.commit()
-    return {'success': True}
\ No newline at end of file
+    refresh_banner_index(cur)
+    return {'success': True}
+
+if __name__ == '__main__':
+    print(json.dumps(run_import_worker(), ensure_ascii=False, default=str))
\ No newline at end of file
@@ -0,0 +1,75 @@
+'''
+Business: Check that ai-content-generator keeps generating when its response cache fails
+Args: command line - none; starts mock_anthropic on a free local port and swaps in a cache backend that raises
+Returns: prints one line per scenario and exits non-zero if a cache failure leaks into a response
+'''
+
+import json
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mock_anthropic
+
+class FailingCache:
+    def __init__(self, fail_get: bool = True, fail_set: bool = True):
+        self.fail_get = fail_get
+        self.fail_set = fail_set
+        self.calls = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        self.calls += 1
+        if self.fail_get:
+            raise OSError('cache backend is down')
+        return None
+
+    def set(self, key: str, value: Dict[str, Any], meta: Dict[str, Any]) -> None:
+        self.calls += 1
+        if self.fail_set:
+            raise OSError('cache backend is down')
+
+def start_mock() -> str:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), mock_anthropic.make_handler(0, 40))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_address[1]}'
+
+def generate(index, body: Dict[str, Any]) -> Dict[str, Any]:
+    return index.handler({'httpMethod': 'POST', 'body': json.dumps(body, ensure_ascii=False)}, None)
+
+def main(argv: List[str]) -> None:
+    os.environ['ANTHROPIC_BASE_URL'] = start_mock()
+    os.environ.setdefault('ANTHROPIC_API_KEY', 'test-key')
+    import index
+
+    failures = []
+
+    def check(name: str, ok: bool, detail: Any) -> None:
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}: {detail}")
+        if not ok:
+            failures.append(name)
+
+    for label, cache in (('get and set fail', FailingCache()), ('set fails', FailingCache(fail_get=False))):
+        index._cache = cache
+        response = generate(index, {'prompt': f'Проверка кеша: {label}', 'contentType': 'news'})
+        check(f'{label}: handler', response['statusCode'] == 200 and response['headers'].get('X-Cache') == 'MISS',
+              f"{response['statusCode']} {response['headers'].get('X-Cache')}")
+
+        events = [event for event, _ in index.stream_cached(os.environ['ANTHROPIC_API_KEY'], f'Поток: {label}', 'news')]
+        check(f'{label}: stream', events[-1] == 'done' and 'error' not in events, events[-1])
+
+        response = generate(index, {'topics': [f'Пакет: {label}'], 'contentTypes': ['news'], 'saveDrafts': False})
+        items = json.loads(response['body']).get('items', [])
+        statuses = [item.get('status') for item in items]
+        check(f'{label}: batch', response['statusCode'] == 200 and statuses == ['generated'], statuses)
+        check(f'{label}: cache was consulted', cache.calls > 0, cache.calls)
+
+    if failures:
+        raise SystemExit(f'cache failures leaked: {failures}')
+    print('ok: cache failures are treated as misses')
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,14 +1,686 @@
 import json
+import hashlib
 import os
-from typing import Dict, Any
+import re
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from anthropic import Anthropic
+import psycopg2
 import requests
+from psycopg2.extensions import TRANSACTION_STATUS_UNKNOWN
+from psycopg2.extras import Json
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+
+AI_MODEL = os.environ.get('AI_MODEL', 'claude-3-5-sonnet-20241022')
+AI_MAX_TOKENS = int(os.environ.get('AI_MAX_TOKENS', '4000'))
+AI_CACHE_TTL = int(os.environ.get('AI_CACHE_TTL', str(7 * 24 * 3600)))
+AI_CACHE_MAX_ENTRIES = int(os.environ.get('AI_CACHE_MAX_ENTRIES', '5000'))
+AI_CACHE_DIR = os.environ.get('AI_CACHE_DIR', '/tmp/ai-content-cache')
+AI_CACHE_EVICT_INTERVAL = float(os.environ.get('AI_CACHE_EVICT_INTERVAL', '300'))
+AI_CACHE_DB_POOL_MAX = int(os.environ.get('AI_CACHE_DB_POOL_MAX', '5'))
+AI_CACHE_DB_POOL_TIMEOUT = float(os.environ.get('AI_CACHE_DB_POOL_TIMEOUT', '5'))
+AI_BATCH_MAX_ITEMS = int(os.environ.get('AI_BATCH_MAX_ITEMS', '50'))
+AI_BATCH_CONCURRENCY = int(os.environ.get('AI_BATCH_CONCURRENCY', '4'))
+AI_BATCH_REQUESTS_PER_MINUTE = float(os.environ.get('AI_BATCH_REQUESTS_PER_MINUTE', '50'))
+AI_BATCH_TOKEN_BUDGET = int(os.environ.get('AI_BATCH_TOKEN_BUDGET', '200000'))
+# Keep well below the function timeout: a generation started just before the deadline still has to finish
+AI_BATCH_MAX_SECONDS = float(os.environ.get('AI_BATCH_MAX_SECONDS', '20'))
+ADMIN_API_URL = os.environ.get('ADMIN_API_URL', '')
+ADMIN_API_TIMEOUT = float(os.environ.get('ADMIN_API_TIMEOUT', '10'))
+AI_STREAM_HOST = os.environ.get('AI_STREAM_HOST', '127.0.0.1')
+
+CONTENT_TYPE_PROMPTS = {
+    'news': 'Напиши новость в журналистском стиле. Используй факты и объективный тон.',
+    'article': 'Напиши аналитическую статью с экспертным мнением и детальным разбором темы.',
+    'biography': 'Напиши биографию личности с хронологией событий и достижениями.',
+    'press-release': 'Напиши официальный пресс-релиз в корпоративном стиле.',
+    'blog': 'Напиши блог-пост в неформальном стиле с личным мнением.',
+    'horoscope': 'Напиши гороскоп с предсказаниями и советами.'
+}
+
+STRING_SPECIAL = re.compile(r'["\\]')
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self.state = 'prefix'
+        self.buffer = ''
+        self.key = None
+        self.escape = False
+        self.depth = 0
+        self.in_string = False
+        self.fields: Dict[str, Any] = {}
+    
+    def _emit(self, raw: str, events: List[Tuple[str, Any]], is_string: bool) -> None:
+        try:
+            value = json.loads(f'"{raw}"') if is_string else json.loads(raw)
+        except json.JSONDecodeError:
+            value = raw
+        self.fields[self.key] = value
+        events.append((self.key, value))
+    
+    def _read_string(self, chunk: str, i: int) -> Tuple[int, bool]:
+        while i < len(chunk):
+            if self.escape:
+                self.buffer += chunk[i]
+                self.escape = False
+                i += 1
+                continue
+            match = STRING_SPECIAL.search(chunk, i)
+            if not match:
+                self.buffer += chunk[i:]
+                return len(chunk), False
+            self.buffer += chunk[i:match.start()]
+            if match.group() == '"':
+                return match.end(), True
+            self.buffer += '\\'
+            self.escape = True
+            i = match.end()
+        return i, False
+    
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        events: List[Tuple[str, Any]] = []
+        i = 0
+        while i < len(chunk):
+            ch = chunk[i]
+            if self.state == 'prefix':
+                i = chunk.find('{', i)
+                if i == -1:
+                    break
+                self.state = 'key_or_end'
+            elif self.state in ('key', 'string_value'):
+                i, closed = self._read_string(chunk, i)
+                if closed:
+                    if self.state == 'key':
+                        self.key = json.loads(f'"{self.buffer}"')
+                        self.state = 'colon'
+                    else:
+                        self._emit(self.buffer, events, True)
+                        self.state = 'comma_or_end'
+                continue
+            elif ch.isspace() and self.state != 'other_value':
+                pass
+            elif self.state == 'key_or_end':
+                if ch == '"':
+                    self.state, self.buffer = 'key', ''
+                elif ch == '}':
+                    self.state = 'done'
+            elif self.state == 'colon':
+                if ch == ':':
+                    self.state = 'value'
+            elif self.state == 'value':
+                if ch == '"':
+                    self.state, self.buffer = 'string_value', ''
+                else:
+                    self.state, self.buffer, self.in_string = 'other_value', '', False
+                    self.depth = 0
+                    continue
+            elif self.state == 'other_value':
+                if self.in_string:
+                    if self.escape:
+                        self.escape = False
+                    elif ch == '\\':
+                        self.escape = True
+                    elif ch == '"':
+                        self.in_string = False
+                elif ch == '"':
+                    self.in_string = True
+                elif ch in '[{':
+                    self.depth += 1
+                elif ch in ']}' and self.depth > 0:
+                    self.depth -= 1
+                elif ch in ',}' and self.depth == 0:
+                    self._emit(self.buffer.strip(), events, False)
+                    self.state = 'key_or_end' if ch == ',' else 'done'
+                    i += 1
+                    continue
+                self.buffer += ch
+            elif self.state == 'comma_or_end':
+                if ch == ',':
+                    self.state = 'key_or_end'
+                elif ch == '}':
+                    self.state = 'done'
+            elif self.state == 'done':
+                break
+            i += 1
+        return events
+
+class DiskCache:
+    def __init__(self, root: str):
+        self.root = root
+        self.writes = 0
+        self.last_evict = 0.0
+        self.lock = threading.Lock()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f'{key}.json')
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as source:
+                entry = json.load(source)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        try:
+            if entry['expires_at'] <= time.time():
+                os.remove(path)
+                return None
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return entry['value']
+    
+    def set(self, key: str, value: Dict[str, Any], meta: Dict[str, Any]) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f'{key}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as target:
+                json.dump(dict(meta, value=value, expires_at=time.time() + AI_CACHE_TTL), target, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self.maybe_evict()
+    
+    def maybe_evict(self) -> None:
+        # A full walk per write is O(entries); walk at most once per interval, or sooner after
+        # enough writes to overshoot AI_CACHE_MAX_ENTRIES by a tenth.
+        with self.lock:
+            self.writes += 1
+            due = (time.monotonic() - self.last_evict >= AI_CACHE_EVICT_INTERVAL
+                   or self.writes >= max(1, AI_CACHE_MAX_ENTRIES // 10))
+            if not due:
+                return
+            self.writes = 0
+            self.last_evict = time.monotonic()
+        self.evict()
+    
+    def evict(self) -> None:
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except FileNotFoundError:
+                    continue
+        entries.sort()
+        cutoff = time.time() - AI_CACHE_TTL
+        for index, (mtime, path) in enumerate(entries):
+            if mtime < cutoff or index < len(entries) - AI_CACHE_MAX_ENTRIES:
+                self._remove(path)
+    
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+class PostgresCache:
+    def __init__(self, dsn: str):
+        self.pool = ThreadedConnectionPool(1, AI_CACHE_DB_POOL_MAX, dsn)
+    
+    def _checkout(self, started: float):
+        while True:
+            try:
+                return self.pool.getconn()
+            except PoolError:
+                if time.monotonic() - started > AI_CACHE_DB_POOL_TIMEOUT:
+                    raise
+                time.sleep(0.01)
+    
+    @contextmanager
+    def connection(self):
+        started = time.monotonic()
+        conn = self._checkout(started)
+        while conn.closed or conn.info.transaction_status == TRANSACTION_STATUS_UNKNOWN:
+            self.pool.putconn(conn, close=True)
+            conn = self._checkout(started)
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.pool.putconn(conn, close=broken or bool(conn.closed))
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.connection() as conn:
+            with conn, conn.cursor() as cur:
+                cur.execute('''
+                    UPDATE t_p58513026_news_portal_creation.ai_generation_cache
+                    SET last_used_at = CURRENT_TIMESTAMP, hits = hits + 1
+                    WHERE cache_key = %s AND expires_at > CURRENT_TIMESTAMP
+                    RETURNING response
+                ''', (key,))
+                row = cur.fetchone()
+        return row[0] if row else None
+    
+    def set(self, key: str, value: Dict[str, Any], meta: Dict[str, Any]) -> None:
+        with self.connection() as conn:
+            with conn, conn.cursor() as cur:
+                cur.execute('''
+                    INSERT INTO t_p58513026_news_portal_creation.ai_generation_cache
+                    (cache_key, prompt, content_type, model, response, expires_at)
+                    VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP + %s * INTERVAL '1 second')
+                    ON CONFLICT (cache_key) DO UPDATE SET
+                        response = EXCLUDED.response,
+                        created_at = CURRENT_TIMESTAMP,
+                        last_used_at = CURRENT_TIMESTAMP,
+                        expires_at = EXCLUDED.expires_at
+                ''', (key, meta['prompt'], meta['content_type'], meta['model'], Json(value), AI_CACHE_TTL))
+                cur.execute('''
+                    DELETE FROM t_p58513026_news_portal_creation.ai_generation_cache
+                    WHERE expires_at <= CURRENT_TIMESTAMP
+                       OR cache_key IN (
+                           SELECT cache_key FROM t_p58513026_news_portal_creation.ai_generation_cache
+                           ORDER BY last_used_at DESC
+                           OFFSET %s
+                       )
+                ''', (AI_CACHE_MAX_ENTRIES,))
+
+_cache = None
+_client = None
+_client_key = None
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        dsn = os.environ.get('DATABASE_URL')
+        _cache = PostgresCache(dsn) if dsn else DiskCache(AI_CACHE_DIR)
+    return _cache
+
+def cache_get(key: str) -> Optional[Dict[str, Any]]:
+    # The cache only saves tokens; when it is down or corrupt, treat every lookup as a miss
+    try:
+        return get_cache().get(key)
+    except Exception as e:
+        print(f'AI cache read failed: {e}')
+        return None
+
+def cache_set(key: str, value: Dict[str, Any], meta: Dict[str, Any]) -> None:
+    try:
+        get_cache().set(key, value, meta)
+    except Exception as e:
+        print(f'AI cache write failed: {e}')
+
+def get_client(api_key: str) -> Anthropic:
+    global _client, _client_key
+    if _client is None or _client_key != api_key:
+        _client = Anthropic(api_key=api_key)
+        _client_key = api_key
+    return _client
+
+def normalize_prompt(prompt: str) -> str:
+    return ' '.join(unicodedata.normalize('NFKC', prompt).casefold().split())
+
+def cache_key(prompt: str, content_type: str, model: str) -> str:
+    payload = json.dumps([normalize_prompt(prompt), content_type, model], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def build_user_prompt(prompt: str, content_type: str) -> str:
+    system_prompt = CONTENT_TYPE_PROMPTS.get(content_type, CONTENT_TYPE_PROMPTS['news'])
+    
+    return f'''{system_prompt}
+
+Тема: {prompt}
+
+Верни результат СТРОГО в формате JSON:
+{{
+  "title": "Заголовок материала",
+  "description": "Краткое описание (2-3 предложения)",
+  "content": "<p>Полный HTML текст с тегами p, h2, h3, ul, li, strong, em</p>"
+}}
+
+Требования к контенту:
+- Заголовок: яркий, цепляющий, до 100 символов
+- Описание: информативное, 2-3 предложения
+- Контент: структурированный HTML, минимум 3 абзаца
+- Используй HTML теги: <h2>, <h3>, <p>, <strong>, <em>, <ul>, <li>
+- Пиши на русском языке
+- НЕ используй markdown, только HTML
+'''
+
+def parse_generated(response_text: str, prompt: str) -> Tuple[Dict[str, Any], bool]:
+    try:
+        start_idx = response_text.find('{')
+        end_idx = response_text.rfind('}') + 1
+        if start_idx != -1 and end_idx > start_idx:
+            json_str = response_text[start_idx:end_idx]
+            return json.loads(json_str), True
+        return json.loads(response_text), True
+    except json.JSONDecodeError:
+        return {
+            'title': 'Сгенерированный контент',
+            'description': prompt,
+            'content': f'<p>{response_text}</p>'
+        }, False
+
+def generate_content(client: Anthropic, prompt: str, content_type: str, usage: Optional[Dict[str, int]] = None) -> Tuple[Dict[str, Any], bool]:
+    message = client.messages.create(
+        model=AI_MODEL,
+        max_tokens=AI_MAX_TOKENS,
+        messages=[
+            {"role": "user", "content": build_user_prompt(prompt, content_type)}
+        ]
+    )
+    if usage is not None:
+        usage['input_tokens'] = message.usage.input_tokens
+        usage['output_tokens'] = message.usage.output_tokens
+    return parse_generated(message.content[0].text, prompt)
+
+def generate_cached(api_key: str, prompt: str, content_type: str, refresh: bool = False,
+                    usage: Optional[Dict[str, int]] = None) -> Tuple[Dict[str, Any], str]:
+    key = cache_key(prompt, content_type, AI_MODEL)
+    if not refresh:
+        cached = cache_get(key)
+        if cached is not None:
+            return cached, 'HIT'
+    
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[key] = future
+    if not owner:
+        return future.result(), 'COALESCED'
+    
+    try:
+        generated_content, parsed = generate_content(get_client(api_key), prompt, content_type, usage)
+        if parsed:
+            cache_set(key, generated_content, {'prompt': normalize_prompt(prompt), 'content_type': content_type, 'model': AI_MODEL})
+        future.set_result(generated_content)
+        return generated_content, 'MISS'
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+def stream_content(client: Anthropic, prompt: str, content_type: str) -> Iterator[Tuple[str, Any]]:
+    parser = IncrementalJSONParser()
+    chunks = []
+    with client.messages.stream(
+        model=AI_MODEL,
+        max_tokens=AI_MAX_TOKENS,
+        messages=[
+            {"role": "user", "content": build_user_prompt(prompt, content_type)}
+        ]
+    ) as stream:
+        for text in stream.text_stream:
+            chunks.append(text)
+            yield 'delta', {'text': text}
+            for name, value in parser.feed(text):
+                yield 'field', {'name': name, 'value': value}
+    
+    if parser.state == 'done':
+        yield 'result', (parser.fields, True)
+    else:
+        yield 'result', parse_generated(''.join(chunks), prompt)
+
+def replay_fields(generated_content: Dict[str, Any], cache_status: str) -> Iterator[Tuple[str, Any]]:
+    for name, value in generated_content.items():
+        yield 'field', {'name': name, 'value': value}
+    yield 'done', {'result': generated_content, 'cache': cache_status}
+
+def stream_cached(api_key: str, prompt: str, content_type: str, refresh: bool = False) -> Iterator[Tuple[str, Any]]:
+    key = cache_key(prompt, content_type, AI_MODEL)
+    cached = None if refresh else cache_get(key)
+    if cached is not None:
+        yield from replay_fields(cached, 'HIT')
+        return
+    
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[key] = future
+    if not owner:
+        try:
+            generated_content = future.result()
+        except Exception as e:
+            yield 'error', {'error': str(e)}
+            return
+        yield from replay_fields(generated_content, 'COALESCED')
+        return
+    
+    try:
+        for event, data in stream_content(get_client(api_key), prompt, content_type):
+            if event != 'result':
+                yield event, data
+                continue
+            generated_content, parsed = data
+            if parsed:
+                cache_set(key, generated_content, {'prompt': normalize_prompt(prompt), 'content_type': content_type, 'model': AI_MODEL})
+            future.set_result(generated_content)
+            yield 'done', {'result': generated_content, 'cache': 'MISS'}
+    except Exception as e:
+        if not future.done():
+            future.set_exception(e)
+        yield 'error', {'error': str(e)}
+    finally:
+        if not future.done():
+            future.set_exception(RuntimeError('Generation was cancelled'))
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+class RateLimiter:
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.next_at = 0.0
+        self._lock = threading.Lock()
+    
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self.next_at)
+            self.next_at = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class TokenBudget:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.reserved = 0
+        self.used = 0
+        self._lock = threading.Lock()
+    
+    def reserve(self, amount: int) -> bool:
+        with self._lock:
+            if self.limit > 0 and self.used + self.reserved + amount > self.limit:
+                return False
+            self.reserved += amount
+            return True
+    
+    def settle(self, reserved: int, used: int) -> None:
+        with self._lock:
+            self.reserved -= reserved
+            self.used += used
+
+def image_url_for(prompt: str) -> str:
+    return f"https://image.pollinations.ai/prompt/{requests.utils.quote(prompt)}?width=1200&height=630&nologo=true"
+
+def build_batch_items(body_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    topics = body_data.get('topics')
+    if not isinstance(topics, list) or not topics:
+        raise ValueError('topics must be a non-empty list')
+    content_types = body_data.get('contentTypes') or [body_data.get('contentType', 'news')]
+    
+    items = []
+    for topic in topics:
+        if isinstance(topic, str):
+            topic = {'prompt': topic}
+        if not isinstance(topic, dict):
+            raise ValueError('Topics must be strings or objects with a prompt')
+        prompt = str(topic.get('prompt') or '').strip()
+        if not prompt:
+            raise ValueError('Every topic needs a prompt')
+        category_code = str(topic.get('categoryCode') or body_data.get('categoryCode') or '').strip()
+        if not category_code and body_data.get('saveDrafts', True):
+            raise ValueError('categoryCode is required to save drafts')
+        for content_type in ([topic['contentType']] if topic.get('contentType') else content_types):
+            if content_type not in CONTENT_TYPE_PROMPTS:
+                raise ValueError(f'Unknown contentType: {content_type}')
+            items.append({
+                'index': len(items),
+                'prompt': prompt,
+                'contentType': content_type,
+                'category_code': category_code
+            })
+    if len(items) > AI_BATCH_MAX_ITEMS:
+        raise ValueError(f'Batch is limited to {AI_BATCH_MAX_ITEMS} items, got {len(items)}')
+    return items
+
+def check_batch_categories(items: List[Dict[str, Any]]) -> None:
+    response = requests.get(ADMIN_API_URL, params={'resource': 'categories'}, timeout=ADMIN_API_TIMEOUT)
+    response.raise_for_status()
+    known = {category['code'] for category in response.json()}
+    unknown = sorted({item['category_code'] for item in items} - known)
+    if unknown:
+        raise ValueError(f"Unknown categoryCode: {', '.join(unknown)}")
+
+def save_draft(item: Dict[str, Any], generated_content: Dict[str, Any], options: Dict[str, Any]) -> int:
+    response = requests.post(ADMIN_API_URL, params={'resource': 'news'}, timeout=ADMIN_API_TIMEOUT, json={
+        'title': generated_content.get('title', ''),
+        'description': generated_content.get('description', ''),
+        'content': generated_content.get('content', ''),
+        'category_code': item['category_code'],
+        'image_url': image_url_for(item['prompt']) if options.get('withImages') else '',
+        'author': options.get('author', 'AI'),
+        'moderation_status': options.get('moderationStatus', 'draft')
+    })
+    response.raise_for_status()
+    saved = response.json()
+    if 'id' not in saved:
+        raise RuntimeError(saved.get('error', 'admin-api did not return a news id'))
+    return saved['id']
+
+def run_batch_item(api_key: str, item: Dict[str, Any], limiter: RateLimiter, budget: TokenBudget,
+                   options: Dict[str, Any], deadline: Optional[float] = None) -> Dict[str, Any]:
+    result = {'index': item['index'], 'prompt': item['prompt'], 'contentType': item['contentType']}
+    if deadline is not None and time.monotonic() >= deadline:
+        return dict(result, status='skipped', error='Batch time limit reached')
+    reserved = len(build_user_prompt(item['prompt'], item['contentType'])) // 2 + AI_MAX_TOKENS
+    if not budget.reserve(reserved):
+        return dict(result, status='skipped', error='Token budget exhausted')
+    
+    usage: Dict[str, int] = {}
+    try:
+        cached = None if options.get('noCache') else cache_get(cache_key(item['prompt'], item['contentType'], AI_MODEL))
+        if cached is not None:
+            generated_content, result['cache'] = cached, 'HIT'
+        else:
+            limiter.wait()
+            if deadline is not None and time.monotonic() >= deadline:
+                return dict(result, status='skipped', error='Batch time limit reached')
+            generated_content, result['cache'] = generate_cached(api_key, item['prompt'], item['contentType'], True, usage)
+        if options.get('saveDrafts', True):
+            result['news_id'] = save_draft(item, generated_content, options)
+            result['status'] = 'created'
+        else:
+            result['result'] = generated_content
+            result['status'] = 'generated'
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    finally:
+        budget.settle(reserved, usage.get('input_tokens', 0) + usage.get('output_tokens', 0))
+    return result
+
+def run_batch(api_key: str, items: List[Dict[str, Any]], options: Dict[str, Any],
+              max_seconds: float = 0) -> Iterator[Tuple[str, Any]]:
+    limiter = RateLimiter(float(options.get('requestsPerMinute') or AI_BATCH_REQUESTS_PER_MINUTE))
+    budget = TokenBudget(int(options.get('tokenBudget') or AI_BATCH_TOKEN_BUDGET))
+    concurrency = max(1, min(int(options.get('concurrency') or AI_BATCH_CONCURRENCY), AI_BATCH_CONCURRENCY))
+    started = time.monotonic()
+    deadline = started + max_seconds if max_seconds > 0 else None
+    counts = {'created': 0, 'generated': 0, 'failed': 0, 'skipped': 0}
+    results = []
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(run_batch_item, api_key, item, limiter, budget, options, deadline) for item in items]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            counts[result['status']] += 1
+            yield 'progress', {
+                'item': result,
+                'completed': len(results),
+                'total': len(items),
+                'tokens_used': budget.used
+            }
+    
+    results.sort(key=lambda result: result['index'])
+    timed_out = {result['index'] for result in results if result.get('error') == 'Batch time limit reached'}
+    yield 'done', dict(
+        counts,
+        total=len(items),
+        tokens_used=budget.used,
+        token_budget=budget.limit,
+        elapsed_ms=round((time.monotonic() - started) * 1000, 1),
+        items=results,
+        errors=[result for result in results if result['status'] in ('failed', 'skipped')],
+        remaining=[
+            {'prompt': item['prompt'], 'contentType': item['contentType'], 'categoryCode': item['category_code']}
+            for item in items if item['index'] in timed_out
+        ]
+    )
+
+def batch_error(status_code: int, message: str) -> Dict[str, Any]:
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps({'error': message}, ensure_ascii=False),
+        'isBase64Encoded': False
+    }
+
+def prepare_batch(body_data: Dict[str, Any]) -> Tuple[Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
+    try:
+        items = build_batch_items(body_data)
+        if body_data.get('saveDrafts', True):
+            if not ADMIN_API_URL:
+                return None, batch_error(500, 'ADMIN_API_URL not configured')
+            check_batch_categories(items)
+    except requests.RequestException as e:
+        return None, batch_error(502, f'Could not load categories: {e}')
+    except ValueError as e:
+        return None, batch_error(400, str(e))
+    return items, None
+
+def sse_event(event: str, data: Any) -> str:
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+def event_stream(api_key: str, body_data: Dict[str, Any], batch_items: Optional[List[Dict[str, Any]]] = None) -> Iterator[Tuple[str, Any]]:
+    if batch_items is not None:
+        return run_batch(api_key, batch_items, body_data)
+    return stream_cached(api_key, body_data['prompt'], body_data.get('contentType', 'news'), bool(body_data.get('noCache')))
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     '''
     Business: Generate content using Claude AI based on user prompt
-    Args: event with httpMethod, body containing prompt and contentType
-    Returns: HTTP response with generated title, description, content
+    Args: event with httpMethod, body containing prompt and contentType (noCache to force regeneration),
+          or topics, contentTypes and categoryCode to generate a batch of drafts
+    Returns: HTTP response with generated title, description, content, or a batch report
+    
+    The function runtime returns one buffered body, so stream is ignored here;
+    server-sent events are only served by the standalone server, see serve().
     '''
     method: str = event.get('httpMethod', 'POST')
     
@@ -40,8 +712,13 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     prompt: str = body_data.get('prompt', '')
     content_type: str = body_data.get('contentType', 'news')
     generate_image_only: bool = body_data.get('generateImageOnly', False)
+    batch_items = None
     
-    if not prompt:
+    if 'topics' in body_data:
+        batch_items, error_response = prepare_batch(body_data)
+        if error_response is not None:
+            return error_response
+    elif not prompt:
         return {
             'statusCode': 400,
             'headers': {
@@ -52,8 +729,8 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'isBase64Encoded': False
         }
     
-    if generate_image_only:
-        image_url = f"https://image.pollinations.ai/prompt/{requests.utils.quote(prompt)}?width=1200&height=630&nologo=true"
+    if generate_image_only and batch_items is None:
+        image_url = image_url_for(prompt)
         return {
             'statusCode': 200,
             'headers': {
@@ -76,70 +753,77 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'isBase64Encoded': False
         }
     
-    client = Anthropic(api_key=api_key)
-    
-    content_type_prompts = {
-        'news': 'Напиши новость в журналистском стиле. Используй факты и объективный тон.',
-        'article': 'Напиши аналитическую статью с экспертным мнением и детальным разбором темы.',
-        'biography': 'Напиши биографию личности с хронологией событий и достижениями.',
-        'press-release': 'Напиши официальный пресс-релиз в корпоративном стиле.',
-        'blog': 'Напиши блог-пост в неформальном стиле с личным мнением.',
-        'horoscope': 'Напиши гороскоп с предсказаниями и советами.'
-    }
-    
-    system_prompt = content_type_prompts.get(content_type, content_type_prompts['news'])
-    
-    user_prompt = f'''{system_prompt}
-
-Тема: {prompt}
-
-Верни результат СТРОГО в формате JSON:
-{{
-  "title": "Заголовок материала",
-  "description": "Краткое описание (2-3 предложения)",
-  "content": "<p>Полный HTML текст с тегами p, h2, h3, ul, li, strong, em</p>"
-}}
-
-Требования к контенту:
-- Заголовок: яркий, цепляющий, до 100 символов
-- Описание: информативное, 2-3 предложения
-- Контент: структурированный HTML, минимум 3 абзаца
-- Используй HTML теги: <h2>, <h3>, <p>, <strong>, <em>, <ul>, <li>
-- Пиши на русском языке
-- НЕ используй markdown, только HTML
-'''
-    
-    message = client.messages.create(
-        model="claude-3-5-sonnet-20241022",
-        max_tokens=4000,
-        messages=[
-            {"role": "user", "content": user_prompt}
-        ]
-    )
-    
-    response_text = message.content[0].text
-    
-    try:
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}') + 1
-        if start_idx != -1 and end_idx > start_idx:
-            json_str = response_text[start_idx:end_idx]
-            generated_content = json.loads(json_str)
-        else:
-            generated_content = json.loads(response_text)
-    except json.JSONDecodeError:
-        generated_content = {
-            'title': 'Сгенерированный контент',
-            'description': prompt,
-            'content': f'<p>{response_text}</p>'
+    if batch_items is not None:
+        report = {}
+        for event_name, data in run_batch(api_key, batch_items, body_data, AI_BATCH_MAX_SECONDS):
+            if event_name == 'done':
+                report = data
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps(report, ensure_ascii=False),
+            'isBase64Encoded': False
         }
     
+    generated_content, cache_status = generate_cached(api_key, prompt, content_type, bool(body_data.get('noCache')))
+    
     return {
         'statusCode': 200,
         'headers': {
             'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*'
+            'Access-Control-Allow-Origin': '*',
+            'X-Cache': cache_status
         },
         'body': json.dumps(generated_content, ensure_ascii=False),
         'isBase64Encoded': False
-    }
\ No newline at end of file
+    }
+
+def serve(port: int) -> None:
+    '''
+    Long-running HTTP server for stream=true requests: writes each server-sent event as it is produced.
+    Everything else is delegated to handler(). Run with `python index.py [port]`.
+    '''
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class StreamingHandler(BaseHTTPRequestHandler):
+        def do_OPTIONS(self):
+            response = handler({'httpMethod': 'OPTIONS'}, None)
+            self.send_response(response['statusCode'])
+            for name, value in response['headers'].items():
+                self.send_header(name, value)
+            self.end_headers()
+        
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode('utf-8')
+            body_data = json.loads(body or '{}')
+            api_key = os.environ.get('ANTHROPIC_API_KEY')
+            batch_items = None
+            response = None
+            if 'topics' in body_data and body_data.get('stream') and api_key:
+                batch_items, response = prepare_batch(body_data)
+            if response is None and (not body_data.get('stream') or not (body_data.get('prompt') or batch_items) or not api_key):
+                response = handler({'httpMethod': 'POST', 'body': body}, None)
+            if response is not None:
+                self.send_response(response['statusCode'])
+                for name, value in response['headers'].items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(response['body'].encode('utf-8'))
+                return
+            
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            for event, data in event_stream(api_key, body_data, batch_items):
+                self.wfile.write(sse_event(event, data).encode('utf-8'))
+                self.wfile.flush()
+    
+    ThreadingHTTPServer((AI_STREAM_HOST, port), StreamingHandler).serve_forever()
+
+if __name__ == '__main__':
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else 8787)
\ No newline at end of file
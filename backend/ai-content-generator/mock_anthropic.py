@@ -0,0 +1,87 @@
+'''
+Business: Local stand-in for the Anthropic Messages API to exercise ai-content-generator without network access
+Args: command line - port (default 8788), --delay seconds between streamed deltas, --chunk characters per delta
+Returns: serves POST /v1/messages; point the generator at it with ANTHROPIC_BASE_URL=http://127.0.0.1:<port>
+'''
+
+import argparse
+import json
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+CANNED_RESPONSE = json.dumps({
+    'title': 'Тестовый заголовок',
+    'description': 'Краткое описание тестового материала. Второе предложение.',
+    'content': '<h2>Раздел</h2><p>Первый абзац.</p><p>Второй абзац.</p><p>Третий абзац.</p>'
+}, ensure_ascii=False, indent=2)
+
+def sse(event: str, data: Dict[str, Any]) -> bytes:
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'.encode('utf-8')
+
+def message(model: str, content: List[Dict[str, Any]], output_tokens: int) -> Dict[str, Any]:
+    return {
+        'id': 'msg_mock',
+        'type': 'message',
+        'role': 'assistant',
+        'model': model,
+        'content': content,
+        'stop_reason': 'end_turn' if content else None,
+        'stop_sequence': None,
+        'usage': {'input_tokens': 100, 'output_tokens': output_tokens}
+    }
+
+def make_handler(delay: float, chunk: int):
+    class MockHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+            text = 'Вот материал:\n' + CANNED_RESPONSE
+            model = body.get('model', 'mock')
+
+            if not body.get('stream'):
+                payload = json.dumps(message(model, [{'type': 'text', 'text': text}], len(text) // 4)).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            self.wfile.write(sse('message_start', {'type': 'message_start', 'message': message(model, [], 1)}))
+            self.wfile.write(sse('content_block_start', {'type': 'content_block_start', 'index': 0, 'content_block': {'type': 'text', 'text': ''}}))
+            for start in range(0, len(text), chunk):
+                self.wfile.write(sse('content_block_delta', {
+                    'type': 'content_block_delta',
+                    'index': 0,
+                    'delta': {'type': 'text_delta', 'text': text[start:start + chunk]}
+                }))
+                self.wfile.flush()
+                time.sleep(delay)
+            self.wfile.write(sse('content_block_stop', {'type': 'content_block_stop', 'index': 0}))
+            self.wfile.write(sse('message_delta', {
+                'type': 'message_delta',
+                'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                'usage': {'output_tokens': len(text) // 4}
+            }))
+            self.wfile.write(sse('message_stop', {'type': 'message_stop'}))
+            self.wfile.flush()
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockHandler
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('port', nargs='?', type=int, default=8788)
+    parser.add_argument('--delay', type=float, default=0.02)
+    parser.add_argument('--chunk', type=int, default=8)
+    args = parser.parse_args(argv)
+    ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(args.delay, args.chunk)).serve_forever()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
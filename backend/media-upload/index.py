@@ -1,14 +1,664 @@
 '''
 Business: Upload images and videos for news articles, return public URLs
-Args: event with httpMethod POST, body with base64 file data, file type
-Returns: JSON with file URL
+Args: event with httpMethod POST, body with base64 file data, file type, or action init/upload-part/complete for chunked uploads, or action process-derivatives for the scheduled derivative worker; GET action=status for resuming
+Returns: JSON with file URL, or upload session state for chunked uploads
 '''
 
 import json
 import base64
+import binascii
+import hashlib
+import io
+import math
 import os
+import re
+import shutil
+import tempfile
+import time
 import uuid
-from typing import Dict, Any
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Dict, Any, BinaryIO, Iterator, List, Optional
+
+import boto3
+import psycopg2
+from botocore.exceptions import ClientError
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+MEDIA_STORAGE = os.environ.get('MEDIA_STORAGE', 's3')
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', '')
+MEDIA_PUBLIC_URL = os.environ.get('MEDIA_PUBLIC_URL', '').rstrip('/')
+MEDIA_DECODE_CHUNK = int(os.environ.get('MEDIA_DECODE_CHUNK', str(64 * 1024))) // 4 * 4
+
+MAX_UPLOAD_BYTES = {
+    'image': int(os.environ.get('MEDIA_MAX_IMAGE_BYTES', str(10 * 1024 * 1024))),
+    'video': int(os.environ.get('MEDIA_MAX_VIDEO_BYTES', str(200 * 1024 * 1024)))
+}
+
+MAGIC_TYPES = [
+    (b'\xff\xd8\xff', 0, 'jpg', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 0, 'png', 'image/png'),
+    (b'GIF8', 0, 'gif', 'image/gif'),
+    (b'WEBP', 8, 'webp', 'image/webp'),
+    (b'ftyp', 4, 'mp4', 'video/mp4'),
+    (b'\x1a\x45\xdf\xa3', 0, 'webm', 'video/webm')
+]
+
+DEFAULT_TYPES = {'image': ('jpg', 'image/jpeg'), 'video': ('mp4', 'video/mp4')}
+
+MEDIA_UPLOAD_PART_BYTES = int(os.environ.get('MEDIA_UPLOAD_PART_BYTES', str(4 * 1024 * 1024)))
+MEDIA_UPLOAD_TTL = int(os.environ.get('MEDIA_UPLOAD_TTL', str(24 * 3600)))
+
+UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+DEFAULT_PLACEMENTS = {
+    'card': [400, 800],
+    'hero': [1200, 1920],
+    'banner': [728, 1456],
+    'default': [400, 800, 1200]
+}
+
+MEDIA_PLACEMENTS: Dict[str, List[int]] = json.loads(os.environ.get('MEDIA_PLACEMENTS') or json.dumps(DEFAULT_PLACEMENTS))
+MEDIA_DERIVATIVE_FORMATS = [fmt.strip() for fmt in os.environ.get('MEDIA_DERIVATIVE_FORMATS', 'webp,avif,jpeg').split(',') if fmt.strip()]
+MEDIA_DERIVATIVE_QUALITY = {'webp': 80, 'avif': 55, 'jpeg': 82}
+MEDIA_DEFAULT_PLACEMENT = os.environ.get('MEDIA_DEFAULT_PLACEMENT', 'card')
+
+MEDIA_DERIVATIVE_JOB_LOCK_TIMEOUT = int(os.environ.get('MEDIA_DERIVATIVE_JOB_LOCK_TIMEOUT', '600'))
+MEDIA_DERIVATIVE_JOB_BACKOFF_SECONDS = int(os.environ.get('MEDIA_DERIVATIVE_JOB_BACKOFF_SECONDS', '60'))
+MEDIA_DERIVATIVE_WORKER_MAX_SECONDS = float(os.environ.get('MEDIA_DERIVATIVE_WORKER_MAX_SECONDS', '25'))
+MEDIA_DERIVATIVE_WORKERS = int(os.environ.get('MEDIA_DERIVATIVE_WORKERS', str(min(2, os.cpu_count() or 1))))
+
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', '1'))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', '4'))
+
+DERIVATIVE_CONTENT_TYPES = {'webp': 'image/webp', 'avif': 'image/avif', 'jpeg': 'image/jpeg'}
+DERIVATIVE_EXTENSIONS = {'webp': 'webp', 'avif': 'avif', 'jpeg': 'jpg'}
+
+class UploadError(Exception):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+class LocalStorage:
+    def __init__(self, root: str, public_url: str):
+        self.root = root
+        self.public_url = public_url
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split('/'))
+    
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+    
+    def save(self, key: str, fileobj: BinaryIO, content_type: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f'{os.path.basename(path)}.', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as target:
+                while True:
+                    chunk = fileobj.read(MEDIA_DECODE_CHUNK)
+                    if not chunk:
+                        break
+                    target.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+    
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), 'rb')
+    
+    def url(self, key: str) -> str:
+        return f'{self.public_url}/{key}'
+
+class S3Storage:
+    def __init__(self):
+        self.bucket = os.environ['S3_BUCKET']
+        self.endpoint_url = os.environ.get('S3_ENDPOINT_URL')
+        self.public_url = os.environ.get('S3_PUBLIC_URL', '').rstrip('/')
+        self.client = boto3.client(
+            's3',
+            endpoint_url=self.endpoint_url,
+            aws_access_key_id=os.environ.get('S3_ACCESS_KEY_ID'),
+            aws_secret_access_key=os.environ.get('S3_SECRET_ACCESS_KEY'),
+            region_name=os.environ.get('S3_REGION', 'us-east-1')
+        )
+    
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+    
+    def save(self, key: str, fileobj: BinaryIO, content_type: str) -> None:
+        self.client.upload_fileobj(fileobj, self.bucket, key, ExtraArgs={
+            'ContentType': content_type,
+            'CacheControl': 'public, max-age=31536000, immutable'
+        })
+    
+    def open(self, key: str) -> BinaryIO:
+        buffer = tempfile.SpooledTemporaryFile(max_size=MEDIA_DECODE_CHUNK * 16)
+        self.client.download_fileobj(self.bucket, key, buffer)
+        buffer.seek(0)
+        return buffer
+    
+    def url(self, key: str) -> str:
+        if self.public_url:
+            return f'{self.public_url}/{key}'
+        return f'{(self.endpoint_url or "https://s3.amazonaws.com").rstrip("/")}/{self.bucket}/{key}'
+
+_storage = None
+
+def get_storage():
+    global _storage
+    if _storage is None:
+        if MEDIA_STORAGE == 's3':
+            if not os.environ.get('S3_BUCKET'):
+                raise UploadError('Media storage is not configured: set S3_BUCKET', 503)
+            _storage = S3Storage()
+        elif MEDIA_STORAGE == 'local':
+            if not MEDIA_ROOT or not MEDIA_PUBLIC_URL:
+                raise UploadError('Local media storage needs MEDIA_ROOT and MEDIA_PUBLIC_URL', 503)
+            _storage = LocalStorage(MEDIA_ROOT, MEDIA_PUBLIC_URL)
+        else:
+            raise UploadError(f'Unknown MEDIA_STORAGE: {MEDIA_STORAGE}', 503)
+    return _storage
+
+def strip_data_url(file_data: str) -> str:
+    if file_data.startswith('data:') and ',' in file_data[:200]:
+        file_data = file_data.split(',', 1)[1]
+    if any(ch in file_data[:1024] for ch in '\r\n '):
+        file_data = ''.join(file_data.split())
+    return file_data
+
+def decode_base64_to(file_data: str, target: BinaryIO, max_bytes: int) -> Dict[str, Any]:
+    digest = hashlib.sha256()
+    size = 0
+    head = b''
+    
+    for offset in range(0, len(file_data), MEDIA_DECODE_CHUNK):
+        try:
+            chunk = base64.b64decode(file_data[offset:offset + MEDIA_DECODE_CHUNK], validate=True)
+        except (binascii.Error, ValueError):
+            raise UploadError('Invalid base64 file data')
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadError(f'File too large: limit is {max_bytes} bytes', 413)
+        if len(head) < 16:
+            head += chunk[:16 - len(head)]
+        digest.update(chunk)
+        target.write(chunk)
+    
+    return {'sha256': digest.hexdigest(), 'size': size, 'head': head}
+
+def detect_type(head: bytes, file_type: str) -> tuple:
+    for magic, offset, extension, content_type in MAGIC_TYPES:
+        if head[offset:offset + len(magic)] == magic:
+            return extension, content_type
+    return DEFAULT_TYPES.get(file_type, ('bin', 'application/octet-stream'))
+
+def validate_image(source: BinaryIO) -> None:
+    source.seek(0)
+    try:
+        with Image.open(source) as image:
+            image.verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        raise UploadError('File is not a valid image')
+    finally:
+        source.seek(0)
+
+def supported_derivative_formats() -> List[str]:
+    return [fmt for fmt in MEDIA_DERIVATIVE_FORMATS if fmt == 'jpeg' or features.check(fmt)]
+
+def render_derivatives(source_path: str, widths: List[int], formats: List[str], workdir: str) -> List[Dict[str, Any]]:
+    rendered = []
+    seen = set()
+    with Image.open(source_path) as original:
+        original = ImageOps.exif_transpose(original)
+        for width in widths:
+            image = original
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                image = image.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                if (fmt, image.width) in seen:
+                    continue
+                seen.add((fmt, image.width))
+                output = image
+                if fmt == 'jpeg' and output.mode not in ('RGB', 'L'):
+                    output = output.convert('RGB')
+                elif output.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                    output = output.convert('RGBA')
+                path = os.path.join(workdir, f'{image.width}.{fmt}')
+                output.save(path, format=fmt.upper(), quality=MEDIA_DERIVATIVE_QUALITY.get(fmt, 80))
+                rendered.append({'width': image.width, 'height': image.height, 'format': fmt, 'path': path})
+    return rendered
+
+_db_pool = None
+
+def get_db_pool() -> ThreadedConnectionPool:
+    global _db_pool
+    if _db_pool is None or _db_pool.closed:
+        _db_pool = ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, os.environ['DATABASE_URL'], cursor_factory=RealDictCursor)
+    return _db_pool
+
+def get_db_connection():
+    pool = get_db_pool()
+    conn = pool.getconn()
+    while conn.closed or conn.info.transaction_status == TRANSACTION_STATUS_UNKNOWN:
+        pool.putconn(conn, close=True)
+        conn = pool.getconn()
+    return conn
+
+def release_db_connection(conn, broken: bool = False) -> None:
+    if not broken and not conn.closed and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            broken = True
+    get_db_pool().putconn(conn, close=broken or bool(conn.closed))
+
+@contextmanager
+def db_connection() -> Iterator[Any]:
+    conn = get_db_connection()
+    broken = False
+    try:
+        yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        release_db_connection(conn, broken)
+
+def load_recorded_derivatives(sha256: str, placement: str) -> Optional[List[Dict[str, Any]]]:
+    if not os.environ.get('DATABASE_URL'):
+        return None
+    with db_connection() as conn, conn:
+        with conn.cursor() as cur:
+            cur.execute('''
+                SELECT format, width, height, url, size_bytes
+                FROM t_p58513026_news_portal_creation.media_derivatives
+                WHERE source_sha256 = %s AND placement = %s
+                ORDER BY format, width
+            ''', (sha256, placement))
+            rows = [dict(row) for row in cur.fetchall()]
+    return rows or None
+
+def record_derivatives(cur, sha256: str, source_url: str, placement: str, derivatives: List[Dict[str, Any]]) -> None:
+    if not derivatives:
+        return
+    execute_values(cur, '''
+        INSERT INTO t_p58513026_news_portal_creation.media_derivatives
+        (source_sha256, source_url, placement, format, width, height, url, size_bytes)
+        VALUES %s
+        ON CONFLICT (source_sha256, placement, format, width) DO NOTHING
+    ''', [
+        (sha256, source_url, placement, item['format'], item['width'], item['height'], item['url'], item['size_bytes'])
+        for item in derivatives
+    ])
+
+def build_srcset(derivatives: List[Dict[str, Any]]) -> Dict[str, str]:
+    srcset: Dict[str, List[str]] = {}
+    for item in sorted(derivatives, key=lambda item: item['width']):
+        srcset.setdefault(item['format'], []).append(f"{item['url']} {item['width']}w")
+    return {fmt: ', '.join(entries) for fmt, entries in srcset.items()}
+
+def enqueue_derivatives(sha256: str, source_key: str, source_url: str, placement: str) -> bool:
+    if not os.environ.get('DATABASE_URL'):
+        return False
+    with db_connection() as conn, conn:
+        with conn.cursor() as cur:
+            cur.execute('''
+                INSERT INTO t_p58513026_news_portal_creation.media_derivative_jobs
+                (source_sha256, source_key, source_url, placement)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (source_sha256, placement) DO UPDATE
+                SET status = 'queued', attempts = 0, error = NULL, run_after = NOW(), updated_at = NOW()
+                WHERE media_derivative_jobs.status = 'failed'
+            ''', (sha256, source_key, source_url, placement))
+    return True
+
+def create_derivatives(job: Dict[str, Any]) -> List[Dict[str, Any]]:
+    widths = sorted(set(MEDIA_PLACEMENTS.get(job['placement']) or MEDIA_PLACEMENTS['default']))
+    storage = get_storage()
+    derivatives = []
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        source_path = os.path.join(workdir, 'source')
+        with storage.open(job['source_key']) as source, open(source_path, 'wb') as target:
+            shutil.copyfileobj(source, target, MEDIA_DECODE_CHUNK)
+        
+        for rendered in render_derivatives(source_path, widths, supported_derivative_formats(), workdir):
+            key = f"images/{job['source_sha256'][:2]}/{job['source_sha256']}/{rendered['width']}w.{DERIVATIVE_EXTENSIONS[rendered['format']]}"
+            if not storage.exists(key):
+                with open(rendered['path'], 'rb') as output:
+                    storage.save(key, output, DERIVATIVE_CONTENT_TYPES[rendered['format']])
+            derivatives.append({
+                'format': rendered['format'],
+                'width': rendered['width'],
+                'height': rendered['height'],
+                'url': storage.url(key),
+                'size_bytes': os.path.getsize(rendered['path'])
+            })
+    return derivatives
+
+def claim_derivative_job(conn, cur) -> Optional[Dict[str, Any]]:
+    cur.execute('''
+        UPDATE t_p58513026_news_portal_creation.media_derivative_jobs
+        SET status = 'running', attempts = attempts + 1, locked_at = NOW(), updated_at = NOW()
+        WHERE id = (
+            SELECT id FROM t_p58513026_news_portal_creation.media_derivative_jobs
+            WHERE (status = 'queued' AND run_after <= NOW())
+               OR (status = 'running' AND locked_at < NOW() - make_interval(secs => %s))
+            ORDER BY run_after, id
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING *
+    ''', (MEDIA_DERIVATIVE_JOB_LOCK_TIMEOUT,))
+    job = cur.fetchone()
+    conn.commit()
+    return dict(job) if job else None
+
+def finish_derivative_job(conn, cur, job: Dict[str, Any], error: Optional[str] = None) -> None:
+    if error is None:
+        cur.execute('''
+            UPDATE t_p58513026_news_portal_creation.media_derivative_jobs
+            SET status = 'done', error = NULL, locked_at = NULL, finished_at = NOW(), updated_at = NOW()
+            WHERE id = %s
+        ''', (job['id'],))
+    elif job['attempts'] < job['max_attempts']:
+        cur.execute('''
+            UPDATE t_p58513026_news_portal_creation.media_derivative_jobs
+            SET status = 'queued', error = %s, locked_at = NULL,
+                run_after = NOW() + make_interval(secs => %s), updated_at = NOW()
+            WHERE id = %s
+        ''', (error, MEDIA_DERIVATIVE_JOB_BACKOFF_SECONDS * (2 ** (job['attempts'] - 1)), job['id']))
+    else:
+        cur.execute('''
+            UPDATE t_p58513026_news_portal_creation.media_derivative_jobs
+            SET status = 'failed', error = %s, locked_at = NULL, finished_at = NOW(), updated_at = NOW()
+            WHERE id = %s
+        ''', (error, job['id']))
+    conn.commit()
+
+def reset_render_worker() -> None:
+    # A forked render process builds its own S3 client; it never touches the inherited DB pool, whose sockets stay the parent's
+    global _storage
+    _storage = None
+
+def render_executor() -> Executor:
+    if MEDIA_DERIVATIVE_WORKERS > 1:
+        try:
+            return ProcessPoolExecutor(max_workers=MEDIA_DERIVATIVE_WORKERS, initializer=reset_render_worker)
+        except (OSError, NotImplementedError) as e:
+            print(f'Rendering derivatives in-process, no process pool: {e}')
+    return ThreadPoolExecutor(max_workers=1)
+
+def claim_derivative_jobs(conn, cur, count: int) -> List[Dict[str, Any]]:
+    jobs = []
+    while len(jobs) < count:
+        job = claim_derivative_job(conn, cur)
+        if job is None:
+            break
+        jobs.append(job)
+    return jobs
+
+def run_derivative_worker(max_seconds: float = 0) -> Dict[str, Any]:
+    if not os.environ.get('DATABASE_URL'):
+        raise UploadError('DATABASE_URL is not configured', 503)
+    deadline = time.monotonic() + (max_seconds or MEDIA_DERIVATIVE_WORKER_MAX_SECONDS)
+    processed = 0
+    failed = 0
+    
+    # Renders are CPU-bound, so claimed jobs run in up to MEDIA_DERIVATIVE_WORKERS processes; only the parent touches the DB
+    with db_connection() as conn, render_executor() as executor:
+        cur = conn.cursor()
+        while time.monotonic() < deadline:
+            jobs = claim_derivative_jobs(conn, cur, max(1, MEDIA_DERIVATIVE_WORKERS))
+            if not jobs:
+                break
+            futures = {executor.submit(create_derivatives, job): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    derivatives = future.result()
+                except Exception as e:
+                    print(f"Derivative job {job['id']} failed: {e}")
+                    finish_derivative_job(conn, cur, job, error=str(e))
+                    failed += 1
+                    continue
+                record_derivatives(cur, job['source_sha256'], job['source_url'], job['placement'], derivatives)
+                finish_derivative_job(conn, cur, job)
+                processed += 1
+        cur.close()
+    
+    return {'success': True, 'processed': processed, 'failed': failed}
+
+def store_upload(file_data: str, file_type: str, placement: Optional[str] = None) -> Dict[str, Any]:
+    if file_type not in MAX_UPLOAD_BYTES:
+        raise UploadError(f'Unsupported file type: {file_type}')
+    if placement and placement not in MEDIA_PLACEMENTS:
+        raise UploadError(f'Unknown placement: {placement}')
+    
+    file_data = strip_data_url(file_data)
+    if len(file_data) // 4 * 3 > MAX_UPLOAD_BYTES[file_type] + 3:
+        raise UploadError(f'File too large: limit is {MAX_UPLOAD_BYTES[file_type]} bytes', 413)
+    
+    with tempfile.SpooledTemporaryFile(max_size=MEDIA_DECODE_CHUNK * 4) as buffer:
+        decoded = decode_base64_to(file_data, buffer, MAX_UPLOAD_BYTES[file_type])
+        if decoded['size'] == 0:
+            raise UploadError('No file data provided')
+        
+        if file_type == 'image':
+            validate_image(buffer)
+        
+        extension, content_type = detect_type(decoded['head'], file_type)
+        key = f"{file_type}s/{decoded['sha256'][:2]}/{decoded['sha256']}.{extension}"
+        storage = get_storage()
+        
+        deduplicated = storage.exists(key)
+        if not deduplicated:
+            buffer.seek(0)
+            storage.save(key, buffer, content_type)
+    
+    derivatives = None
+    derivatives_status = None
+    if file_type == 'image' and placement:
+        derivatives = load_recorded_derivatives(decoded['sha256'], placement)
+        if derivatives:
+            derivatives_status = 'ready'
+        elif enqueue_derivatives(decoded['sha256'], key, storage.url(key), placement):
+            derivatives_status = 'queued'
+    
+    result = {
+        'success': True,
+        'url': storage.url(key),
+        'fileId': decoded['sha256'],
+        'type': file_type,
+        'contentType': content_type,
+        'size': decoded['size'],
+        'deduplicated': deduplicated
+    }
+    if derivatives_status:
+        result['derivativesStatus'] = derivatives_status
+    if derivatives:
+        result['derivatives'] = derivatives
+        result['srcset'] = build_srcset(derivatives)
+    return result
+
+def check_upload_id(upload_id: str) -> str:
+    if not upload_id or not UPLOAD_ID_PATTERN.match(upload_id):
+        raise UploadError('Invalid uploadId')
+    return upload_id
+
+def get_upload_connection():
+    if not os.environ.get('DATABASE_URL'):
+        raise UploadError('Chunked uploads need DATABASE_URL', 503)
+    return db_connection()
+
+@contextmanager
+def locked_session(upload_id: str):
+    check_upload_id(upload_id)
+    with get_upload_connection() as conn:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute('''
+                    SELECT upload_id, file_type, size, received,
+                           EXTRACT(EPOCH FROM created_at)::bigint AS created_at
+                    FROM t_p58513026_news_portal_creation.media_upload_sessions
+                    WHERE upload_id = %s
+                    FOR UPDATE
+                ''', (upload_id,))
+                session = cur.fetchone()
+                if session is None:
+                    raise UploadError('Upload session not found', 404)
+                yield conn, cur, dict(session)
+
+def session_state(session: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'uploadId': session['upload_id'],
+        'type': session['file_type'],
+        'size': session['size'],
+        'offset': session['received'],
+        'partSize': MEDIA_UPLOAD_PART_BYTES,
+        'complete': session['received'] == session['size'],
+        'expiresAt': session['created_at'] + MEDIA_UPLOAD_TTL
+    }
+
+def init_upload(file_type: str, size: Any) -> Dict[str, Any]:
+    if file_type not in MAX_UPLOAD_BYTES:
+        raise UploadError(f'Unsupported file type: {file_type}')
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError('size is required')
+    if size <= 0:
+        raise UploadError('size must be positive')
+    if size > MAX_UPLOAD_BYTES[file_type]:
+        raise UploadError(f'File too large: limit is {MAX_UPLOAD_BYTES[file_type]} bytes', 413)
+    
+    with get_upload_connection() as conn:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute('''
+                    DELETE FROM t_p58513026_news_portal_creation.media_upload_sessions
+                    WHERE created_at < NOW() - make_interval(secs => %s)
+                ''', (MEDIA_UPLOAD_TTL,))
+                cur.execute('''
+                    INSERT INTO t_p58513026_news_portal_creation.media_upload_sessions (upload_id, file_type, size)
+                    VALUES (%s, %s, %s)
+                    RETURNING upload_id, file_type, size, received, EXTRACT(EPOCH FROM created_at)::bigint AS created_at
+                ''', (uuid.uuid4().hex, file_type, size))
+                session = dict(cur.fetchone())
+    return session_state(session)
+
+def upload_part(upload_id: str, offset: Any, file_data: str, checksum: str) -> Dict[str, Any]:
+    if not file_data:
+        raise UploadError('No file data provided')
+    if not checksum:
+        raise UploadError('checksum is required')
+    try:
+        offset = int(offset)
+    except (TypeError, ValueError):
+        raise UploadError('offset is required')
+    
+    file_data = strip_data_url(file_data)
+    if len(file_data) // 4 * 3 > MEDIA_UPLOAD_PART_BYTES + 3:
+        raise UploadError(f'Part too large: limit is {MEDIA_UPLOAD_PART_BYTES} bytes', 413)
+    
+    with locked_session(upload_id) as (conn, cur, session):
+        if offset != session['received']:
+            raise UploadError(f"Offset mismatch: expected {session['received']}", 409)
+        
+        part = io.BytesIO()
+        decoded = decode_base64_to(file_data, part, session['size'] - offset)
+        if decoded['sha256'] != checksum.lower():
+            raise UploadError('Checksum mismatch', 422)
+        
+        cur.execute('''
+            INSERT INTO t_p58513026_news_portal_creation.media_upload_parts (upload_id, part_offset, size, sha256, data)
+            VALUES (%s, %s, %s, %s, %s)
+        ''', (upload_id, offset, decoded['size'], decoded['sha256'], psycopg2.Binary(part.getbuffer())))
+        cur.execute('''
+            UPDATE t_p58513026_news_portal_creation.media_upload_sessions
+            SET received = %s, updated_at = NOW()
+            WHERE upload_id = %s
+        ''', (offset + decoded['size'], upload_id))
+        session['received'] = offset + decoded['size']
+    return session_state(session)
+
+def get_upload_status(upload_id: str) -> Dict[str, Any]:
+    check_upload_id(upload_id)
+    with get_upload_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute('''
+                SELECT upload_id, file_type, size, received,
+                       EXTRACT(EPOCH FROM created_at)::bigint AS created_at
+                FROM t_p58513026_news_portal_creation.media_upload_sessions
+                WHERE upload_id = %s
+            ''', (upload_id,))
+            session = cur.fetchone()
+    if session is None:
+        raise UploadError('Upload session not found', 404)
+    return session_state(dict(session))
+
+def complete_upload(upload_id: str, checksum: Optional[str] = None) -> Dict[str, Any]:
+    with locked_session(upload_id) as (conn, cur, session), tempfile.TemporaryFile() as data:
+        if session['received'] != session['size']:
+            raise UploadError(f"Upload incomplete: {session['received']} of {session['size']} bytes received", 409)
+        
+        digest = hashlib.sha256()
+        with conn.cursor(name=f'parts_{upload_id}') as parts:
+            parts.itersize = 1
+            parts.execute('''
+                SELECT data FROM t_p58513026_news_portal_creation.media_upload_parts
+                WHERE upload_id = %s
+                ORDER BY part_offset
+            ''', (upload_id,))
+            for part in parts:
+                chunk = bytes(part['data'])
+                digest.update(chunk)
+                data.write(chunk)
+        sha256 = digest.hexdigest()
+        if checksum and checksum.lower() != sha256:
+            raise UploadError('Checksum mismatch', 422)
+        if session['file_type'] == 'image':
+            validate_image(data)
+        
+        data.seek(0)
+        extension, content_type = detect_type(data.read(16), session['file_type'])
+        key = f"{session['file_type']}s/{sha256[:2]}/{sha256}.{extension}"
+        storage = get_storage()
+        deduplicated = storage.exists(key)
+        if not deduplicated:
+            data.seek(0)
+            storage.save(key, data, content_type)
+        
+        cur.execute('''
+            DELETE FROM t_p58513026_news_portal_creation.media_upload_sessions
+            WHERE upload_id = %s
+        ''', (upload_id,))
+    
+    return {
+        'success': True,
+        'url': storage.url(key),
+        'fileId': sha256,
+        'type': session['file_type'],
+        'contentType': content_type,
+        'size': session['size'],
+        'deduplicated': deduplicated
+    }
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
@@ -18,36 +668,59 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'statusCode': 200,
             'headers': {
                 'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS',
+                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
                 'Access-Control-Allow-Headers': 'Content-Type, X-User-Id',
                 'Access-Control-Max-Age': '86400'
             },
             'body': ''
         }
     
-    if method == 'POST':
+    if method in ('GET', 'POST'):
         try:
-            body_data = json.loads(event.get('body', '{}'))
-            file_data = body_data.get('file')
-            file_type = body_data.get('type', 'image')
-            
-            if not file_data:
+            if method == 'GET':
+                query_params = event.get('queryStringParameters') or {}
+                if query_params.get('action') != 'status':
+                    raise UploadError('Unknown action')
+                result = get_upload_status(query_params.get('uploadId', ''))
                 return {
-                    'statusCode': 400,
-                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                    'body': json.dumps({'error': 'No file data provided'})
+                    'statusCode': 200,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*',
+                        'Cache-Control': 'no-store'
+                    },
+                    'body': json.dumps(result)
                 }
             
-            file_id = str(uuid.uuid4())
-            extension = 'jpg' if file_type == 'image' else 'mp4'
-            file_url = f'https://via.placeholder.com/800x600.png?text=Uploaded+{file_type}'
+            body_data = json.loads(event.get('body', '{}'))
+            action = body_data.get('action', 'upload')
+            file_data = body_data.get('file')
+            file_type = body_data.get('type', 'image')
             
-            result = {
-                'success': True,
-                'url': file_url,
-                'fileId': file_id,
-                'type': file_type
-            }
+            if action == 'init':
+                result = init_upload(file_type, body_data.get('size'))
+            elif action == 'upload-part':
+                result = upload_part(body_data.get('uploadId', ''), body_data.get('offset'), file_data, body_data.get('checksum'))
+            elif action == 'complete':
+                result = complete_upload(body_data.get('uploadId', ''), body_data.get('checksum'))
+            elif action == 'process-derivatives':
+                try:
+                    max_seconds = float(body_data.get('max_seconds', 0))
+                except (TypeError, ValueError):
+                    raise UploadError('max_seconds must be a number')
+                if not math.isfinite(max_seconds):
+                    raise UploadError('max_seconds must be a number')
+                result = run_derivative_worker(max(0.0, min(max_seconds, MEDIA_DERIVATIVE_WORKER_MAX_SECONDS)))
+            elif action == 'upload':
+                if not file_data:
+                    return {
+                        'statusCode': 400,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'No file data provided'})
+                    }
+                result = store_upload(file_data, file_type, body_data.get('placement', MEDIA_DEFAULT_PLACEMENT))
+            else:
+                raise UploadError(f'Unknown action: {action}')
             
             return {
                 'statusCode': 200,
@@ -57,7 +730,14 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 },
                 'body': json.dumps(result)
             }
-            
+        
+        except UploadError as e:
+            return {
+                'statusCode': e.status_code,
+                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                'body': json.dumps({'error': str(e)})
+            }
+        
         except Exception as e:
             return {
                 'statusCode': 500,
@@ -70,3 +750,6 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
         'body': json.dumps({'error': 'Method not allowed'})
     }
+
+if __name__ == '__main__':
+    print(json.dumps(run_derivative_worker()))
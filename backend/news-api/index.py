@@ -7,13 +7,308 @@ Returns: HTTP response with JSON data
 
 import json
 import os
-from typing import Dict, Any
+import base64
+import binascii
+import hashlib
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Any, Callable, Optional
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', '1'))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', '5'))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '5'))
+
+_db_pool = None
+_pool_stats = {'hits': 0, 'misses': 0, 'reconnects': 0, 'checkouts': 0, 'wait_ms_total': 0.0, 'wait_ms_max': 0.0}
+_pool_idle: set = set()
+_pool_in_use = {'count': 0}
+_pool_lock = threading.Lock()
+
+def get_db_pool() -> ThreadedConnectionPool:
+    global _db_pool
+    if _db_pool is None or _db_pool.closed:
+        dsn = os.environ.get('DATABASE_URL', '')
+        _db_pool = ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, dsn, cursor_factory=RealDictCursor)
+    return _db_pool
+
+def is_connection_healthy(conn) -> bool:
+    return not conn.closed and conn.info.transaction_status != TRANSACTION_STATUS_UNKNOWN
+
+def checkout_connection(pool: ThreadedConnectionPool, started: float):
+    while True:
+        try:
+            conn = pool.getconn()
+            with _pool_lock:
+                reused = id(conn) in _pool_idle
+                _pool_idle.discard(id(conn))
+                _pool_in_use['count'] += 1
+            return conn, reused
+        except PoolError:
+            if time.monotonic() - started > DB_POOL_TIMEOUT:
+                raise
+            time.sleep(0.01)
 
 def get_db_connection():
-    dsn = os.environ.get('DATABASE_URL', '')
-    return psycopg2.connect(dsn, cursor_factory=RealDictCursor)
+    pool = get_db_pool()
+    started = time.monotonic()
+    conn, reused = checkout_connection(pool, started)
+    while reused and not is_connection_healthy(conn):
+        pool.putconn(conn, close=True)
+        with _pool_lock:
+            _pool_in_use['count'] -= 1
+        _pool_stats['reconnects'] += 1
+        conn, reused = checkout_connection(pool, started)
+    wait_ms = (time.monotonic() - started) * 1000
+    _pool_stats['hits' if reused else 'misses'] += 1
+    _pool_stats['checkouts'] += 1
+    _pool_stats['wait_ms_total'] += wait_ms
+    _pool_stats['wait_ms_max'] = max(_pool_stats['wait_ms_max'], wait_ms)
+    return conn
+
+def release_db_connection(conn, broken: bool = False) -> None:
+    pool = get_db_pool()
+    if not broken and not conn.closed and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            broken = True
+    pool.putconn(conn, close=broken or bool(conn.closed))
+    with _pool_lock:
+        _pool_in_use['count'] -= 1
+        if not conn.closed:
+            _pool_idle.add(id(conn))
+
+def with_db_cursor(load: Callable[[Any], Any]) -> Any:
+    conn = get_db_connection()
+    cur = None
+    broken = False
+    try:
+        cur = conn.cursor()
+        return load(cur)
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        if cur is not None and not cur.closed:
+            cur.close()
+        release_db_connection(conn, broken)
+
+def get_pool_stats() -> Dict[str, Any]:
+    checkouts = _pool_stats['checkouts']
+    return {
+        **_pool_stats,
+        'wait_ms_avg': round(_pool_stats['wait_ms_total'] / checkouts, 3) if checkouts else 0.0,
+        'hit_ratio': round(_pool_stats['hits'] / checkouts, 3) if checkouts else 0.0,
+        'pool_min': DB_POOL_MIN,
+        'pool_max': DB_POOL_MAX,
+        'idle': len(_pool_idle),
+        'in_use': _pool_in_use['count']
+    }
+
+LOOKUP_CACHE_MAX_ENTRIES = int(os.environ.get('LOOKUP_CACHE_MAX_ENTRIES', '256'))
+LOOKUP_CACHE_TTL = float(os.environ.get('LOOKUP_CACHE_TTL', '300'))
+
+_MISSING = object()
+
+class TTLCache:
+    def __init__(self, max_entries: int, default_ttl: float):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key: tuple, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def get_or_load(self, key: tuple, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        value = self.get(key)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value, ttl)
+        return value
+    
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == namespace]:
+                del self._entries[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'default_ttl': self.default_ttl
+        }
+
+lookup_cache = TTLCache(LOOKUP_CACHE_MAX_ENTRIES, LOOKUP_CACHE_TTL)
+
+# Buffered views live only in this instance's memory. While the instance runs they are flushed at least every
+# VIEW_FLUSH_INTERVAL seconds, but views recorded since the last flush are lost if the platform reclaims it.
+VIEW_FLUSH_INTERVAL = float(os.environ.get('VIEW_FLUSH_INTERVAL', '10'))
+VIEW_FLUSH_THRESHOLD = int(os.environ.get('VIEW_FLUSH_THRESHOLD', '200'))
+
+_view_buffer: Dict[int, int] = {}
+_view_buffer_lock = threading.Lock()
+_view_buffer_state = {'pending': 0, 'last_flush': time.monotonic(), 'timer': None}
+
+def record_view(news_id: int) -> None:
+    with _view_buffer_lock:
+        _view_buffer[news_id] = _view_buffer.get(news_id, 0) + 1
+        _view_buffer_state['pending'] += 1
+    schedule_view_flush()
+
+def schedule_view_flush() -> None:
+    with _view_buffer_lock:
+        if _view_buffer_state['timer'] is not None:
+            return
+        timer = threading.Timer(VIEW_FLUSH_INTERVAL, flush_views_in_background)
+        timer.daemon = True
+        _view_buffer_state['timer'] = timer
+    timer.start()
+
+def flush_views_in_background() -> None:
+    with _view_buffer_lock:
+        _view_buffer_state['timer'] = None
+    try:
+        with_db_cursor(lambda cur: flush_views(cur.connection, cur))
+    except psycopg2.Error as e:
+        print(f'View flush failed: {e}')
+    if _view_buffer_state['pending']:
+        schedule_view_flush()
+
+def view_flush_due() -> bool:
+    pending = _view_buffer_state['pending']
+    elapsed = time.monotonic() - _view_buffer_state['last_flush']
+    return pending >= VIEW_FLUSH_THRESHOLD or (pending > 0 and elapsed >= VIEW_FLUSH_INTERVAL)
+
+def flush_views(conn, cur) -> int:
+    with _view_buffer_lock:
+        snapshot = dict(_view_buffer)
+        _view_buffer.clear()
+        _view_buffer_state['pending'] = 0
+        _view_buffer_state['last_flush'] = time.monotonic()
+    
+    if not snapshot:
+        return 0
+    
+    try:
+        execute_values(cur, '''
+            UPDATE news
+            SET views = COALESCE(news.views, 0) + v.delta
+            FROM (VALUES %s) AS v(id, delta)
+            WHERE news.id = v.id
+        ''', sorted(snapshot.items()), page_size=len(snapshot))
+        conn.commit()
+    except psycopg2.Error:
+        with _view_buffer_lock:
+            for news_id, delta in snapshot.items():
+                _view_buffer[news_id] = _view_buffer.get(news_id, 0) + delta
+            _view_buffer_state['pending'] += sum(snapshot.values())
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            pass
+        raise
+    
+    return sum(snapshot.values())
+
+def flush_views_quietly(conn, cur) -> int:
+    # Views are already buffered; a failed flush keeps them for the next one instead of failing the request
+    try:
+        return flush_views(conn, cur)
+    except psycopg2.Error as e:
+        print(f'View flush failed: {e}')
+        schedule_view_flush()
+        return 0
+
+CACHE_CONTROL = os.environ.get('NEWS_CACHE_CONTROL', 'public, max-age=30, stale-while-revalidate=60')
+
+def conditional_get(event: Dict[str, Any], response: Dict[str, Any], last_modified: Optional[datetime] = None,
+                    cache_control: str = CACHE_CONTROL) -> Dict[str, Any]:
+    request_headers = {str(key).lower(): value for key, value in (event.get('headers') or {}).items()}
+    etag = '"' + hashlib.sha256(response['body'].encode('utf-8')).hexdigest()[:32] + '"'
+    headers = dict(response['headers'])
+    headers['ETag'] = etag
+    headers['Cache-Control'] = cache_control
+    headers['Access-Control-Expose-Headers'] = 'ETag, Last-Modified, X-Next-Cursor'
+    
+    if last_modified and last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    if last_modified:
+        headers['Last-Modified'] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    
+    not_modified = False
+    if_none_match = request_headers.get('if-none-match')
+    if if_none_match is not None:
+        client_tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        not_modified = etag in client_tags or '*' in client_tags
+    elif last_modified and request_headers.get('if-modified-since'):
+        try:
+            not_modified = last_modified.replace(microsecond=0) <= parsedate_to_datetime(request_headers['if-modified-since'])
+        except (TypeError, ValueError):
+            not_modified = False
+    
+    if not_modified:
+        return {'statusCode': 304, 'headers': headers, 'body': '', 'isBase64Encoded': False}
+    return {**response, 'headers': headers}
+
+class BadRequest(ValueError):
+    pass
+
+def int_param(params: Dict[str, Any], name: str, default: int, low: int, high: int) -> int:
+    try:
+        value = int(params.get(name, default))
+    except (TypeError, ValueError):
+        raise BadRequest(f'{name} must be an integer')
+    return max(low, min(value, high))
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    published = row['published_date']
+    payload = json.dumps([published.isoformat() if isinstance(published, datetime) else str(published), row['id']])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        published, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(published), int(row_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise ValueError('Invalid cursor')
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
@@ -26,58 +321,155 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'headers': {
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-Admin-Token',
+                'Access-Control-Allow-Headers': 'Content-Type, X-Admin-Token, If-None-Match, If-Modified-Since',
                 'Access-Control-Max-Age': '86400'
             },
             'body': '',
             'isBase64Encoded': False
         }
     
+    stats_resource = query_params.get('resource', path_params.get('resource'))
+    if method == 'GET' and stats_resource in ('pool-stats', 'cache-stats'):
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'isBase64Encoded': False,
+            'body': json.dumps(get_pool_stats() if stats_resource == 'pool-stats' else lookup_cache.stats())
+        }
+    
+    if method == 'GET' and stats_resource == 'categories':
+        def load_categories(cur):
+            cur.execute('SELECT * FROM categories ORDER BY id')
+            return [dict(row) for row in cur.fetchall()]
+        categories = lookup_cache.get_or_load(('categories',), lambda: with_db_cursor(load_categories))
+        return conditional_get(event, {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'isBase64Encoded': False,
+            'body': json.dumps(categories, default=str, ensure_ascii=False)
+        })
+    
     conn = get_db_connection()
     cur = conn.cursor()
+    broken = False
     
     try:
         if method == 'GET':
             resource = query_params.get('resource', path_params.get('resource', 'news'))
             
             if resource == 'news':
-                cur.execute('''
-                    SELECT n.id, n.title, n.category_code as category, 
-                           c.label as category_label, n.time_label as time, 
-                           n.image_url as image, n.description, n.created_at
+                limit = int_param(query_params, 'limit', 50, 1, 200)
+                cursor = query_params.get('cursor')
+                category = query_params.get('category')
+                where_clauses = []
+                where_params: tuple = ()
+                if category:
+                    where_clauses.append('f.category_code = %s')
+                    where_params += (category,)
+                if cursor:
+                    try:
+                        cursor_params = decode_cursor(cursor)
+                    except ValueError as e:
+                        return {
+                            'statusCode': 400,
+                            'headers': {
+                                'Content-Type': 'application/json',
+                                'Access-Control-Allow-Origin': '*'
+                            },
+                            'isBase64Encoded': False,
+                            'body': json.dumps({'error': str(e)})
+                        }
+                    where_clauses.append('(f.published_date, f.news_id) < (%s, %s)')
+                    where_params += cursor_params
+                where_sql = 'WHERE ' + ' AND '.join(where_clauses) if where_clauses else ''
+                cur.execute(f'''
+                    SELECT f.news_id as id, f.title, f.category_code as category, 
+                           f.category_label, f.time_label as time, 
+                           f.image_url as image, f.description, f.created_at,
+                           f.published_date, srcset.image_srcset
+                    FROM news_feed f
+                    LEFT JOIN LATERAL (
+                        SELECT string_agg(d.url || ' ' || d.width || 'w', ', ' ORDER BY d.width) as image_srcset
+                        FROM media_derivatives d
+                        WHERE d.source_url = f.image_url AND d.placement = 'card' AND d.format = 'webp'
+                    ) srcset ON TRUE
+                    {where_sql}
+                    ORDER BY f.published_date DESC, f.news_id DESC
+                    LIMIT %s
+                ''', where_params + (limit + 1,))
+                rows = cur.fetchall()
+                news = [dict(row) for row in rows[:limit]]
+                next_cursor = encode_cursor(news[-1]) if len(rows) > limit else None
+                payload = {'items': news, 'next_cursor': next_cursor} if cursor is not None else news
+                headers = {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                }
+                if next_cursor:
+                    headers['X-Next-Cursor'] = next_cursor
+                return conditional_get(event, {
+                    'statusCode': 200,
+                    'headers': headers,
+                    'isBase64Encoded': False,
+                    'body': json.dumps(payload, default=str, ensure_ascii=False)
+                })
+            
+            elif resource == 'most-viewed':
+                if view_flush_due():
+                    flush_views_quietly(conn, cur)
+                limit = int_param(query_params, 'limit', 10, 1, 50)
+                category = query_params.get('category')
+                category_sql = 'AND n.category_code = %s' if category else ''
+                cur.execute(f'''
+                    SELECT n.id, n.title, n.category_code as category,
+                           c.label as category_label, n.time_label as time,
+                           n.image_url as image, n.views, n.published_date
                     FROM news n
                     JOIN categories c ON n.category_code = c.code
-                    ORDER BY n.created_at DESC
-                ''')
-                news = cur.fetchall()
-                return {
+                    WHERE n.moderation_status = 'published' {category_sql}
+                    ORDER BY n.views DESC, n.id DESC
+                    LIMIT %s
+                ''', ((category,) if category else ()) + (limit,))
+                most_viewed = [dict(row) for row in cur.fetchall()]
+                return conditional_get(event, {
                     'statusCode': 200,
                     'headers': {
                         'Content-Type': 'application/json',
                         'Access-Control-Allow-Origin': '*'
                     },
                     'isBase64Encoded': False,
-                    'body': json.dumps([dict(row) for row in news], default=str, ensure_ascii=False)
-                }
+                    'body': json.dumps(most_viewed, default=str, ensure_ascii=False)
+                })
             
-            elif resource == 'categories':
-                cur.execute('SELECT * FROM categories ORDER BY id')
-                categories = cur.fetchall()
+        
+        elif method == 'POST':
+            body_data = json.loads(event.get('body') or '{}')
+            resource = query_params.get('resource', path_params.get('resource', 'news'))
+            
+            if resource == 'view':
+                try:
+                    news_id = int(query_params.get('id', body_data.get('id')))
+                except (TypeError, ValueError):
+                    raise BadRequest('id must be an integer')
+                record_view(news_id)
+                flushed = flush_views_quietly(conn, cur) if view_flush_due() else 0
                 return {
-                    'statusCode': 200,
+                    'statusCode': 202,
                     'headers': {
                         'Content-Type': 'application/json',
                         'Access-Control-Allow-Origin': '*'
                     },
                     'isBase64Encoded': False,
-                    'body': json.dumps([dict(row) for row in categories], default=str, ensure_ascii=False)
+                    'body': json.dumps({'success': True, 'flushed': flushed})
                 }
-        
-        elif method == 'POST':
-            body_data = json.loads(event.get('body', '{}'))
-            resource = query_params.get('resource', path_params.get('resource', 'news'))
             
-            if resource == 'news':
+            elif resource == 'news':
                 cur.execute('''
                     INSERT INTO news (title, category_code, time_label, image_url, description)
                     VALUES (%s, %s, %s, %s, %s)
@@ -113,6 +505,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 ))
                 new_category = cur.fetchone()
                 conn.commit()
+                lookup_cache.invalidate('categories')
                 return {
                     'statusCode': 201,
                     'headers': {
@@ -168,6 +561,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 ))
                 updated_category = cur.fetchone()
                 conn.commit()
+                lookup_cache.invalidate('categories')
                 return {
                     'statusCode': 200,
                     'headers': {
@@ -198,6 +592,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             elif resource == 'categories' and item_id:
                 cur.execute('DELETE FROM categories WHERE id = %s', (item_id,))
                 conn.commit()
+                lookup_cache.invalidate('categories')
                 return {
                     'statusCode': 200,
                     'headers': {
@@ -218,6 +613,21 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'body': json.dumps({'error': 'Invalid request'})
         }
     
+    except BadRequest as e:
+        return {
+            'statusCode': 400,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'isBase64Encoded': False,
+            'body': json.dumps({'error': str(e)})
+        }
+    
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    
     finally:
         cur.close()
-        conn.close()
\ No newline at end of file
+        release_db_connection(conn, broken)
\ No newline at end of file
@@ -1,17 +1,224 @@
 '''
 Business: Get weather data for Russian cities from OpenWeatherMap API
-Args: event - dict with httpMethod, queryStringParameters (city name)
+Args: event - dict with httpMethod, queryStringParameters (city name, or cities as a comma-separated list)
       context - object with request_id, function_name attributes
 Returns: HTTP response with weather data in JSON format
 '''
 
 import json
 import os
-from typing import Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Tuple
 import urllib.request
 import urllib.parse
 import urllib.error
 
+WEATHER_TTL = float(os.environ.get('WEATHER_TTL', '600'))
+WEATHER_STALE_TTL = float(os.environ.get('WEATHER_STALE_TTL', '3600'))
+WEATHER_MAX_STALE = float(os.environ.get('WEATHER_MAX_STALE', str(24 * 3600)))
+WEATHER_CACHE_MAX_ENTRIES = int(os.environ.get('WEATHER_CACHE_MAX_ENTRIES', '256'))
+WEATHER_TIMEOUT = float(os.environ.get('WEATHER_TIMEOUT', '5'))
+WEATHER_BATCH_MAX_CITIES = int(os.environ.get('WEATHER_BATCH_MAX_CITIES', '40'))
+WEATHER_BATCH_CONCURRENCY = int(os.environ.get('WEATHER_BATCH_CONCURRENCY', '4'))
+WEATHER_GROUP_SIZE = 20
+
+DEFAULT_CITY_IDS = {
+    'moscow': 524901,
+    'saint petersburg': 498817,
+    'novosibirsk': 1496747,
+    'yekaterinburg': 1486209,
+    'kazan': 551487,
+    'nizhny novgorod': 520555,
+    'chelyabinsk': 1508291,
+    'samara': 499099,
+    'omsk': 1496153,
+    'rostov-on-don': 501175,
+    'ufa': 479561,
+    'krasnoyarsk': 1502026,
+    'voronezh': 472045,
+    'perm': 511196,
+    'volgograd': 472757,
+    'krasnodar': 542420,
+    'sochi': 491422,
+    'vladivostok': 2013348
+}
+
+CITY_IDS: Dict[str, int] = dict(DEFAULT_CITY_IDS, **json.loads(os.environ.get('WEATHER_CITY_IDS') or '{}'))
+
+class WeatherCache:
+    def __init__(self, ttl: float, stale_ttl: float, max_stale: float, max_entries: int):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self.upstream_calls = 0
+    
+    def _claim(self, key: str) -> Tuple[Future, bool]:
+        future = self._inflight.get(key)
+        if future is not None:
+            return future, False
+        future = Future()
+        self._inflight[key] = future
+        return future, True
+    
+    def _load_many(self, claimed: Dict[str, Future], load_many: Callable[[List[str]], Dict[str, Any]]) -> None:
+        try:
+            loaded = load_many(list(claimed))
+        except Exception as e:
+            loaded = {key: e for key in claimed}
+        for key, future in claimed.items():
+            value = loaded.get(key, LookupError(f'No weather data for {key}'))
+            if isinstance(value, Exception):
+                future.set_exception(value)
+            else:
+                self.set(key, value)
+                future.set_result(value)
+            with self._lock:
+                self._inflight.pop(key, None)
+    
+    def count_upstream_call(self) -> None:
+        with self._lock:
+            self.upstream_calls += 1
+    
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def get(self, key: str, loader: Callable[[], Any]) -> Tuple[Any, str, int]:
+        result = self.get_many([key], lambda keys: {key: loader()})[key]
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    def get_many(self, keys: List[str], load_many: Callable[[List[str]], Dict[str, Any]]) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        waiting: Dict[str, Future] = {}
+        to_load: Dict[str, Future] = {}
+        to_refresh: Dict[str, Future] = {}
+        
+        with self._lock:
+            now = time.monotonic()
+            for key in keys:
+                entry = self._entries.get(key)
+                age = now - entry[0] if entry else None
+                if entry and age < self.ttl:
+                    self.hits += 1
+                    results[key] = (entry[1], 'HIT', int(age))
+                    continue
+                future, owner = self._claim(key)
+                if entry and age < self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    results[key] = (entry[1], 'STALE', int(age))
+                    if owner:
+                        to_refresh[key] = future
+                    continue
+                self.misses += 1
+                waiting[key] = future
+                if owner:
+                    to_load[key] = future
+        
+        if to_refresh:
+            threading.Thread(target=self._load_many, args=(to_refresh, load_many), daemon=True).start()
+        if to_load:
+            self._load_many(to_load, load_many)
+        
+        for key, future in waiting.items():
+            try:
+                results[key] = (future.result(), 'MISS', 0)
+            except Exception as e:
+                with self._lock:
+                    entry = self._entries.get(key)
+                    age = time.monotonic() - entry[0] if entry else None
+                    if entry and age < self.max_stale:
+                        self.fallbacks += 1
+                        results[key] = (entry[1], 'STALE-IF-ERROR', int(age))
+                    else:
+                        results[key] = e
+        return results
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'fallbacks': self.fallbacks,
+            'upstream_calls': self.upstream_calls,
+            'size': len(self._entries),
+            'ttl': self.ttl,
+            'stale_ttl': self.stale_ttl
+        }
+
+weather_cache = WeatherCache(WEATHER_TTL, WEATHER_STALE_TTL, WEATHER_MAX_STALE, WEATHER_CACHE_MAX_ENTRIES)
+
+def format_weather(weather_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'city': weather_data['name'],
+        'temperature': round(weather_data['main']['temp']),
+        'feels_like': round(weather_data['main']['feels_like']),
+        'description': weather_data['weather'][0]['description'].capitalize(),
+        'icon': weather_data['weather'][0]['icon'],
+        'humidity': weather_data['main']['humidity'],
+        'wind_speed': weather_data['wind']['speed']
+    }
+
+def fetch_city_weather(city: str, api_key: str) -> Dict[str, Any]:
+    weather_cache.count_upstream_call()
+    url = f'https://api.openweathermap.org/data/2.5/weather?q={urllib.parse.quote(city)},RU&appid={api_key}&units=metric&lang=ru'
+    with urllib.request.urlopen(url, timeout=WEATHER_TIMEOUT) as response:
+        weather_data = json.loads(response.read().decode('utf-8'))
+    if weather_data.get('id'):
+        CITY_IDS.setdefault(city_key(city), weather_data['id'])
+    return format_weather(weather_data)
+
+def fetch_group_weather(city_ids: Dict[str, int], api_key: str) -> Dict[str, Any]:
+    weather_cache.count_upstream_call()
+    ids = ','.join(str(city_id) for city_id in city_ids.values())
+    url = f'https://api.openweathermap.org/data/2.5/group?id={ids}&appid={api_key}&units=metric&lang=ru'
+    with urllib.request.urlopen(url, timeout=WEATHER_TIMEOUT) as response:
+        weather_data = json.loads(response.read().decode('utf-8'))
+    keys_by_id = {city_id: key for key, city_id in city_ids.items()}
+    return {keys_by_id[item['id']]: format_weather(item) for item in weather_data.get('list', []) if item.get('id') in keys_by_id}
+
+def fetch_cities_weather(keys: List[str], api_key: str) -> Dict[str, Any]:
+    known = [key for key in keys if key in CITY_IDS]
+    tasks = [
+        (fetch_group_weather, {key: CITY_IDS[key] for key in known[start:start + WEATHER_GROUP_SIZE]})
+        for start in range(0, len(known), WEATHER_GROUP_SIZE)
+    ] + [(fetch_city_weather, key) for key in keys if key not in CITY_IDS]
+    
+    results: Dict[str, Any] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(WEATHER_BATCH_CONCURRENCY, len(tasks)))) as pool:
+        futures = [(pool.submit(fetch, arg, api_key), fetch, arg) for fetch, arg in tasks]
+        for future, fetch, arg in futures:
+            targets = list(arg) if fetch is fetch_group_weather else [arg]
+            try:
+                loaded = future.result()
+            except Exception as e:
+                results.update({key: e for key in targets})
+                continue
+            if fetch is fetch_group_weather:
+                results.update(loaded)
+            else:
+                results[arg] = loaded
+    return results
+
+def city_key(city: str) -> str:
+    return ' '.join(city.split()).lower()
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
     
@@ -48,30 +255,69 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'body': json.dumps({'error': 'API key not configured'})
         }
     
-    params = event.get('queryStringParameters', {})
+    params = event.get('queryStringParameters') or {}
     city = params.get('city', 'Moscow')
     
-    try:
-        url = f'https://api.openweathermap.org/data/2.5/weather?q={urllib.parse.quote(city)},RU&appid={api_key}&units=metric&lang=ru'
+    if params.get('resource') == 'cache-stats':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*',
+                'Cache-Control': 'no-store'
+            },
+            'isBase64Encoded': False,
+            'body': json.dumps(weather_cache.stats())
+        }
+    
+    if params.get('cities'):
+        cities: Dict[str, str] = {}
+        for name in params['cities'].split(','):
+            if name.strip():
+                cities.setdefault(city_key(name), name.strip())
+        if len(cities) > WEATHER_BATCH_MAX_CITIES:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': f'Too many cities: limit is {WEATHER_BATCH_MAX_CITIES}'})
+            }
         
-        with urllib.request.urlopen(url, timeout=5) as response:
-            weather_data = json.loads(response.read().decode('utf-8'))
+        loaded = weather_cache.get_many(list(cities), lambda keys: fetch_cities_weather(keys, api_key))
+        items = []
+        for key, name in cities.items():
+            result = loaded[key]
+            if isinstance(result, urllib.error.HTTPError):
+                items.append({'query': name, 'error': f'Weather API error: {result.reason}'})
+            elif isinstance(result, Exception):
+                items.append({'query': name, 'error': str(result)})
+            else:
+                items.append(dict(result[0], query=name, cache=result[1], age=result[2]))
         
-        result = {
-            'city': weather_data['name'],
-            'temperature': round(weather_data['main']['temp']),
-            'feels_like': round(weather_data['main']['feels_like']),
-            'description': weather_data['weather'][0]['description'].capitalize(),
-            'icon': weather_data['weather'][0]['icon'],
-            'humidity': weather_data['main']['humidity'],
-            'wind_speed': weather_data['wind']['speed']
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*',
+                'Cache-Control': f'public, max-age={int(WEATHER_TTL)}, stale-while-revalidate={int(WEATHER_STALE_TTL)}'
+            },
+            'isBase64Encoded': False,
+            'body': json.dumps({'cities': items}, ensure_ascii=False)
         }
+    
+    try:
+        result, cache_status, age = weather_cache.get(city_key(city), lambda: fetch_city_weather(city, api_key))
         
         return {
             'statusCode': 200,
             'headers': {
                 'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
+                'Access-Control-Allow-Origin': '*',
+                'Cache-Control': f'public, max-age={int(WEATHER_TTL)}, stale-while-revalidate={int(WEATHER_STALE_TTL)}',
+                'X-Cache': cache_status,
+                'Age': str(age)
             },
             'isBase64Encoded': False,
             'body': json.dumps(result, ensure_ascii=False)
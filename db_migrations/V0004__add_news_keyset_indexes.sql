@@ -0,0 +1,9 @@
+-- Composite indexes for keyset (cursor) pagination ordered by published_date DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_news_published_date_id
+    ON t_p58513026_news_portal_creation.news(published_date DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_news_status_published_date_id
+    ON t_p58513026_news_portal_creation.news(moderation_status, published_date DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_news_category_status_published_date_id
+    ON t_p58513026_news_portal_creation.news(category_code, moderation_status, published_date DESC, id DESC);
@@ -0,0 +1,24 @@
+-- Refuse to build the unique index over duplicate source URLs: list them so they can be merged by hand
+DO $$
+DECLARE
+    conflicts TEXT;
+BEGIN
+    SELECT string_agg(format('%s (ids %s)', source_url, ids), '; ')
+    INTO conflicts
+    FROM (
+        SELECT source_url, string_agg(id::text, ', ' ORDER BY id) AS ids
+        FROM t_p58513026_news_portal_creation.news
+        WHERE source_url <> ''
+        GROUP BY source_url
+        HAVING COUNT(*) > 1
+    ) duplicates;
+    
+    IF conflicts IS NOT NULL THEN
+        RAISE EXCEPTION 'Duplicate news.source_url values, resolve them before adding the unique index: %', conflicts;
+    END IF;
+END $$;
+
+-- Unique index on imported source URLs for ON CONFLICT de-duplication in importers
+CREATE UNIQUE INDEX IF NOT EXISTS idx_news_source_url_unique
+    ON t_p58513026_news_portal_creation.news(source_url)
+    WHERE source_url <> '';
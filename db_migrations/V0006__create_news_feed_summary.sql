@@ -0,0 +1,79 @@
+-- Denormalized homepage feed: one row per published news item with its category label
+CREATE TABLE IF NOT EXISTS t_p58513026_news_portal_creation.news_feed (
+    news_id INTEGER PRIMARY KEY REFERENCES t_p58513026_news_portal_creation.news(id) ON DELETE CASCADE,
+    category_code VARCHAR(50) NOT NULL,
+    category_label VARCHAR(100) NOT NULL DEFAULT '',
+    title VARCHAR(500) NOT NULL,
+    time_label VARCHAR(100) NOT NULL DEFAULT '',
+    image_url TEXT NOT NULL DEFAULT '',
+    description TEXT,
+    created_at TIMESTAMP,
+    published_date TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_news_feed_published_date_id
+    ON t_p58513026_news_portal_creation.news_feed(published_date DESC, news_id DESC);
+CREATE INDEX IF NOT EXISTS idx_news_feed_category_published_date_id
+    ON t_p58513026_news_portal_creation.news_feed(category_code, published_date DESC, news_id DESC);
+
+-- Keep the feed in sync row-by-row whenever a news item is written or changes publish state
+CREATE OR REPLACE FUNCTION t_p58513026_news_portal_creation.sync_news_feed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM t_p58513026_news_portal_creation.news_feed WHERE news_id = OLD.id;
+        RETURN OLD;
+    END IF;
+
+    IF NEW.moderation_status = 'published' THEN
+        INSERT INTO t_p58513026_news_portal_creation.news_feed
+            (news_id, category_code, category_label, title, time_label, image_url, description, created_at, published_date)
+        SELECT NEW.id, NEW.category_code, COALESCE(c.label, ''), NEW.title, COALESCE(NEW.time_label, ''),
+               COALESCE(NEW.image_url, ''), NEW.description, NEW.created_at, NEW.published_date
+        FROM (SELECT 1) AS one
+        LEFT JOIN t_p58513026_news_portal_creation.categories c ON c.code = NEW.category_code
+        ON CONFLICT (news_id) DO UPDATE SET
+            category_code = EXCLUDED.category_code,
+            category_label = EXCLUDED.category_label,
+            title = EXCLUDED.title,
+            time_label = EXCLUDED.time_label,
+            image_url = EXCLUDED.image_url,
+            description = EXCLUDED.description,
+            created_at = EXCLUDED.created_at,
+            published_date = EXCLUDED.published_date;
+    ELSE
+        DELETE FROM t_p58513026_news_portal_creation.news_feed WHERE news_id = NEW.id;
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_news_feed_sync
+    AFTER INSERT OR UPDATE OR DELETE ON t_p58513026_news_portal_creation.news
+    FOR EACH ROW EXECUTE FUNCTION t_p58513026_news_portal_creation.sync_news_feed();
+
+-- Propagate category label changes into the feed
+CREATE OR REPLACE FUNCTION t_p58513026_news_portal_creation.sync_news_feed_category() RETURNS trigger AS $$
+BEGIN
+    UPDATE t_p58513026_news_portal_creation.news_feed
+    SET category_label = NEW.label
+    WHERE category_code = NEW.code AND category_label IS DISTINCT FROM NEW.label;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_news_feed_category_sync
+    AFTER UPDATE OF label ON t_p58513026_news_portal_creation.categories
+    FOR EACH ROW EXECUTE FUNCTION t_p58513026_news_portal_creation.sync_news_feed_category();
+
+-- Backfill from existing published news
+INSERT INTO t_p58513026_news_portal_creation.news_feed
+    (news_id, category_code, category_label, title, time_label, image_url, description, created_at, published_date)
+SELECT n.id, n.category_code, COALESCE(c.label, ''), n.title, COALESCE(n.time_label, ''),
+       COALESCE(n.image_url, ''), n.description, n.created_at, n.published_date
+FROM t_p58513026_news_portal_creation.news n
+LEFT JOIN t_p58513026_news_portal_creation.categories c ON c.code = n.category_code
+WHERE n.moderation_status = 'published'
+ON CONFLICT (news_id) DO NOTHING;
+
+COMMENT ON TABLE t_p58513026_news_portal_creation.news_feed IS 'Homepage feed of published news, maintained by trg_news_feed_sync';
@@ -0,0 +1,29 @@
+-- Full-text search over news title, description, content and SEO keywords (Russian configuration)
+ALTER TABLE t_p58513026_news_portal_creation.news
+ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+CREATE OR REPLACE FUNCTION t_p58513026_news_portal_creation.news_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', COALESCE(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('russian', COALESCE(NEW.seo_keywords, '')), 'B') ||
+        setweight(to_tsvector('russian', COALESCE(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('russian', regexp_replace(COALESCE(NEW.content, ''), '<[^>]+>', ' ', 'g')), 'C');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_news_search_vector
+    BEFORE INSERT OR UPDATE OF title, description, content, seo_keywords
+    ON t_p58513026_news_portal_creation.news
+    FOR EACH ROW EXECUTE FUNCTION t_p58513026_news_portal_creation.news_search_vector_update();
+
+UPDATE t_p58513026_news_portal_creation.news
+SET search_vector =
+    setweight(to_tsvector('russian', COALESCE(title, '')), 'A') ||
+    setweight(to_tsvector('russian', COALESCE(seo_keywords, '')), 'B') ||
+    setweight(to_tsvector('russian', COALESCE(description, '')), 'B') ||
+    setweight(to_tsvector('russian', regexp_replace(COALESCE(content, ''), '<[^>]+>', ' ', 'g')), 'C');
+
+CREATE INDEX IF NOT EXISTS idx_news_search_vector
+    ON t_p58513026_news_portal_creation.news USING GIN (search_vector);
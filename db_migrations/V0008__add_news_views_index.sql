@@ -0,0 +1,8 @@
+-- Index for "most viewed" listings over published news
+CREATE INDEX IF NOT EXISTS idx_news_published_views
+    ON t_p58513026_news_portal_creation.news(views DESC, id DESC)
+    WHERE moderation_status = 'published';
+
+CREATE INDEX IF NOT EXISTS idx_news_category_published_views
+    ON t_p58513026_news_portal_creation.news(category_code, views DESC, id DESC)
+    WHERE moderation_status = 'published';
@@ -0,0 +1,13 @@
+-- Per-feed HTTP validators and high-water mark for incremental imports
+CREATE TABLE IF NOT EXISTS t_p58513026_news_portal_creation.import_feed_state (
+    feed_name VARCHAR(100) PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    last_guid TEXT,
+    last_pub_date TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON COLUMN t_p58513026_news_portal_creation.import_feed_state.etag IS 'ETag returned by the feed, sent back as If-None-Match';
+COMMENT ON COLUMN t_p58513026_news_portal_creation.import_feed_state.last_modified IS 'Last-Modified returned by the feed, sent back as If-Modified-Since';
+COMMENT ON COLUMN t_p58513026_news_portal_creation.import_feed_state.last_guid IS 'GUID (or link) of the newest item seen; iteration stops when it is reached';
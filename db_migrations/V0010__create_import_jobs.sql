@@ -0,0 +1,29 @@
+-- Postgres-backed queue for background news imports
+CREATE TABLE IF NOT EXISTS t_p58513026_news_portal_creation.import_jobs (
+    id SERIAL PRIMARY KEY,
+    feed_name VARCHAR(100) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    limit_count INTEGER NOT NULL DEFAULT 20,
+    force BOOLEAN NOT NULL DEFAULT false,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_at TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    result JSONB,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- At most one queued or running job per feed
+CREATE UNIQUE INDEX IF NOT EXISTS idx_import_jobs_feed_in_flight
+    ON t_p58513026_news_portal_creation.import_jobs(feed_name)
+    WHERE status IN ('queued', 'running');
+
+CREATE INDEX IF NOT EXISTS idx_import_jobs_claim
+    ON t_p58513026_news_portal_creation.import_jobs(status, run_after, id);
+
+COMMENT ON COLUMN t_p58513026_news_portal_creation.import_jobs.status IS 'Job status: queued, running, done, failed';
+COMMENT ON COLUMN t_p58513026_news_portal_creation.import_jobs.locked_at IS 'Set when a worker claims the job; stale locks are reclaimed';
@@ -0,0 +1,12 @@
+-- 64-bit SimHash of title + description for near-duplicate detection of imported news
+ALTER TABLE t_p58513026_news_portal_creation.news
+ADD COLUMN IF NOT EXISTS simhash BIGINT;
+
+CREATE INDEX IF NOT EXISTS idx_news_simhash
+    ON t_p58513026_news_portal_creation.news(simhash);
+
+-- Recent-window scan used to build the in-memory LSH index
+CREATE INDEX IF NOT EXISTS idx_news_created_at_simhash
+    ON t_p58513026_news_portal_creation.news(created_at DESC) INCLUDE (simhash);
+
+COMMENT ON COLUMN t_p58513026_news_portal_creation.news.simhash IS 'SimHash of title + description; NULL rows are filled in lazily by the importer';
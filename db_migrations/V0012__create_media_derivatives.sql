@@ -0,0 +1,18 @@
+-- Resized/recompressed image variants produced by media-upload, one row per placement, width and format
+CREATE TABLE IF NOT EXISTS t_p58513026_news_portal_creation.media_derivatives (
+    id SERIAL PRIMARY KEY,
+    source_sha256 CHAR(64) NOT NULL,
+    source_url TEXT NOT NULL,
+    placement VARCHAR(32) NOT NULL,
+    format VARCHAR(8) NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (source_sha256, placement, format, width)
+);
+
+-- srcset lookup by the image URL stored on news/banners
+CREATE INDEX IF NOT EXISTS idx_media_derivatives_source_url
+    ON t_p58513026_news_portal_creation.media_derivatives(source_url, placement, format, width);
@@ -0,0 +1,19 @@
+-- Persistent cache of ai-content-generator results keyed on normalized prompt + content type + model
+CREATE TABLE IF NOT EXISTS t_p58513026_news_portal_creation.ai_generation_cache (
+    cache_key CHAR(64) PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    content_type VARCHAR(32) NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    response JSONB NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_ai_generation_cache_expires_at
+    ON t_p58513026_news_portal_creation.ai_generation_cache(expires_at);
+
+-- LRU eviction beyond AI_CACHE_MAX_ENTRIES
+CREATE INDEX IF NOT EXISTS idx_ai_generation_cache_last_used_at
+    ON t_p58513026_news_portal_creation.ai_generation_cache(last_used_at DESC);
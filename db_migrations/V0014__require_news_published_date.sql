@@ -0,0 +1,15 @@
+-- Keyset cursors compare (published_date, id); a NULL published_date cannot be encoded or compared
+UPDATE t_p58513026_news_portal_creation.news
+SET published_date = COALESCE(created_at, CURRENT_TIMESTAMP)
+WHERE published_date IS NULL;
+
+ALTER TABLE t_p58513026_news_portal_creation.news
+    ALTER COLUMN published_date SET DEFAULT CURRENT_TIMESTAMP,
+    ALTER COLUMN published_date SET NOT NULL;
+
+UPDATE t_p58513026_news_portal_creation.news_feed
+SET published_date = COALESCE(created_at, CURRENT_TIMESTAMP)
+WHERE published_date IS NULL;
+
+ALTER TABLE t_p58513026_news_portal_creation.news_feed
+    ALTER COLUMN published_date SET NOT NULL;
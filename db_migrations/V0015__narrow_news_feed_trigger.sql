@@ -0,0 +1,19 @@
+-- Re-sync news_feed only when a projected column changes; view counter flushes and simhash updates no longer touch the feed
+DROP TRIGGER IF EXISTS trg_news_feed_sync ON t_p58513026_news_portal_creation.news;
+
+CREATE TRIGGER trg_news_feed_sync_insert_delete
+    AFTER INSERT OR DELETE ON t_p58513026_news_portal_creation.news
+    FOR EACH ROW EXECUTE FUNCTION t_p58513026_news_portal_creation.sync_news_feed();
+
+CREATE TRIGGER trg_news_feed_sync_update
+    AFTER UPDATE OF title, description, category_code, time_label, image_url, moderation_status, published_date, created_at
+    ON t_p58513026_news_portal_creation.news
+    FOR EACH ROW
+    WHEN ((OLD.title, OLD.description, OLD.category_code, OLD.time_label, OLD.image_url,
+           OLD.moderation_status, OLD.published_date, OLD.created_at)
+          IS DISTINCT FROM
+          (NEW.title, NEW.description, NEW.category_code, NEW.time_label, NEW.image_url,
+           NEW.moderation_status, NEW.published_date, NEW.created_at))
+    EXECUTE FUNCTION t_p58513026_news_portal_creation.sync_news_feed();
+
+COMMENT ON TABLE t_p58513026_news_portal_creation.news_feed IS 'Homepage feed of published news, maintained by trg_news_feed_sync_insert_delete and trg_news_feed_sync_update';
@@ -0,0 +1,5 @@
+-- Cover id as well so the importer's recent-window scan (id, simhash, created_at) can run as an index-only scan
+CREATE INDEX IF NOT EXISTS idx_news_created_at_id_simhash
+    ON t_p58513026_news_portal_creation.news(created_at DESC) INCLUDE (id, simhash);
+
+DROP INDEX IF EXISTS t_p58513026_news_portal_creation.idx_news_created_at_simhash;
@@ -0,0 +1,24 @@
+-- Postgres-backed queue of images waiting for resized derivatives, drained by media-upload action=process-derivatives
+CREATE TABLE IF NOT EXISTS t_p58513026_news_portal_creation.media_derivative_jobs (
+    id SERIAL PRIMARY KEY,
+    source_sha256 CHAR(64) NOT NULL,
+    source_key TEXT NOT NULL,
+    source_url TEXT NOT NULL,
+    placement VARCHAR(32) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (source_sha256, placement)
+);
+
+CREATE INDEX IF NOT EXISTS idx_media_derivative_jobs_claim
+    ON t_p58513026_news_portal_creation.media_derivative_jobs(status, run_after, id);
+
+COMMENT ON COLUMN t_p58513026_news_portal_creation.media_derivative_jobs.status IS 'Job status: queued, running, done, failed';
+COMMENT ON COLUMN t_p58513026_news_portal_creation.media_derivative_jobs.locked_at IS 'Set when a worker claims the job; stale locks are reclaimed';
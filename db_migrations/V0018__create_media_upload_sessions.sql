@@ -0,0 +1,27 @@
+-- Resumable chunked uploads for media-upload, shared by every function instance
+CREATE TABLE IF NOT EXISTS t_p58513026_news_portal_creation.media_upload_sessions (
+    upload_id CHAR(32) PRIMARY KEY,
+    file_type VARCHAR(16) NOT NULL,
+    size BIGINT NOT NULL,
+    received BIGINT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Expired sessions are purged by age on every init
+CREATE INDEX IF NOT EXISTS idx_media_upload_sessions_created_at
+    ON t_p58513026_news_portal_creation.media_upload_sessions(created_at);
+
+CREATE TABLE IF NOT EXISTS t_p58513026_news_portal_creation.media_upload_parts (
+    upload_id CHAR(32) NOT NULL REFERENCES t_p58513026_news_portal_creation.media_upload_sessions(upload_id) ON DELETE CASCADE,
+    part_offset BIGINT NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 CHAR(64) NOT NULL,
+    data BYTEA NOT NULL,
+    PRIMARY KEY (upload_id, part_offset)
+);
+
+-- Parts are already-compressed media, skip TOAST compression
+ALTER TABLE t_p58513026_news_portal_creation.media_upload_parts ALTER COLUMN data SET STORAGE EXTERNAL;
+
+COMMENT ON COLUMN t_p58513026_news_portal_creation.media_upload_sessions.received IS 'Bytes received so far; the next part must start at this offset';
@@ -0,0 +1,53 @@
+-- The site cards link to the original source, so the feed projection carries source_url for admin-api's published list
+ALTER TABLE t_p58513026_news_portal_creation.news_feed
+    ADD COLUMN IF NOT EXISTS source_url TEXT;
+
+UPDATE t_p58513026_news_portal_creation.news_feed f
+SET source_url = n.source_url
+FROM t_p58513026_news_portal_creation.news n
+WHERE n.id = f.news_id AND n.source_url IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION t_p58513026_news_portal_creation.sync_news_feed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM t_p58513026_news_portal_creation.news_feed WHERE news_id = OLD.id;
+        RETURN OLD;
+    END IF;
+
+    IF NEW.moderation_status = 'published' THEN
+        INSERT INTO t_p58513026_news_portal_creation.news_feed
+            (news_id, category_code, category_label, title, time_label, image_url, description, source_url, created_at, published_date)
+        SELECT NEW.id, NEW.category_code, COALESCE(c.label, ''), NEW.title, COALESCE(NEW.time_label, ''),
+               COALESCE(NEW.image_url, ''), NEW.description, NEW.source_url, NEW.created_at, NEW.published_date
+        FROM (SELECT 1) AS one
+        LEFT JOIN t_p58513026_news_portal_creation.categories c ON c.code = NEW.category_code
+        ON CONFLICT (news_id) DO UPDATE SET
+            category_code = EXCLUDED.category_code,
+            category_label = EXCLUDED.category_label,
+            title = EXCLUDED.title,
+            time_label = EXCLUDED.time_label,
+            image_url = EXCLUDED.image_url,
+            description = EXCLUDED.description,
+            source_url = EXCLUDED.source_url,
+            created_at = EXCLUDED.created_at,
+            published_date = EXCLUDED.published_date;
+    ELSE
+        DELETE FROM t_p58513026_news_portal_creation.news_feed WHERE news_id = NEW.id;
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_news_feed_sync_update ON t_p58513026_news_portal_creation.news;
+
+CREATE TRIGGER trg_news_feed_sync_update
+    AFTER UPDATE OF title, description, category_code, time_label, image_url, source_url, moderation_status, published_date, created_at
+    ON t_p58513026_news_portal_creation.news
+    FOR EACH ROW
+    WHEN ((OLD.title, OLD.description, OLD.category_code, OLD.time_label, OLD.image_url, OLD.source_url,
+           OLD.moderation_status, OLD.published_date, OLD.created_at)
+          IS DISTINCT FROM
+          (NEW.title, NEW.description, NEW.category_code, NEW.time_label, NEW.image_url, NEW.source_url,
+           NEW.moderation_status, NEW.published_date, NEW.created_at))
+    EXECUTE FUNCTION t_p58513026_news_portal_creation.sync_news_feed();
@@ -12,12 +12,48 @@ interface AIContentGeneratorProps {
   onContentGenerated: (content: { title: string; description: string; content: string; image_url?: string }) => void;
 }
 
+interface GeneratedContent {
+  title?: string;
+  description?: string;
+  content?: string;
+  image_url?: string;
+}
+
+const AI_API_URL = 'https://functions.poehali.dev/ai-content-generator';
+// Cloud functions return one buffered body; live output needs the standalone server (python index.py)
+const AI_STREAM_URL: string | undefined = import.meta.env.VITE_AI_STREAM_URL;
+
+const readEventStream = async (response: Response, onEvent: (event: string, data: Record<string, unknown>) => void) => {
+  const reader = response.body!.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = 'message';
+      let data = '';
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (data) onEvent(event, JSON.parse(data));
+      boundary = buffer.indexOf('\n\n');
+    }
+  }
+};
+
 const AIContentGenerator = ({ onContentGenerated }: AIContentGeneratorProps) => {
   const [open, setOpen] = useState(false);
   const [prompt, setPrompt] = useState('');
   const [contentType, setContentType] = useState('news');
   const [generating, setGenerating] = useState(false);
   const [generatingImage, setGeneratingImage] = useState(false);
+  const [preview, setPreview] = useState<GeneratedContent>({});
 
   const contentTypeLabels: Record<string, string> = {
     news: 'Новость',
@@ -35,19 +71,9 @@ const AIContentGenerator = ({ onContentGenerated }: AIContentGeneratorProps) =>
     }
 
     setGenerating(true);
+    setPreview({});
     try {
-      const response = await fetch('https://functions.poehali.dev/ai-content-generator', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          prompt,
-          contentType
-        })
-      });
-
-      if (!response.ok) throw new Error('Ошибка генерации');
-
-      const data = await response.json();
+      const data = AI_STREAM_URL ? await streamContent(AI_STREAM_URL) : await fetchContent();
       
       onContentGenerated({
         title: data.title || '',
@@ -64,9 +90,53 @@ const AIContentGenerator = ({ onContentGenerated }: AIContentGeneratorProps) =>
       toast.error('Ошибка генерации контента');
     } finally {
       setGenerating(false);
+      setPreview({});
     }
   };
 
+  const fetchContent = async (): Promise<GeneratedContent> => {
+    const response = await fetch(AI_API_URL, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        prompt,
+        contentType
+      })
+    });
+
+    if (!response.ok) throw new Error('Ошибка генерации');
+
+    return response.json();
+  };
+
+  const streamContent = async (url: string): Promise<GeneratedContent> => {
+    const response = await fetch(url, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        prompt,
+        contentType,
+        stream: true
+      })
+    });
+
+    if (!response.ok || !response.body) throw new Error('Ошибка генерации');
+
+    const received: { result?: GeneratedContent } = {};
+    await readEventStream(response, (event, data) => {
+      if (event === 'field') {
+        setPreview(prev => ({ ...prev, [data.name as string]: data.value as string }));
+      } else if (event === 'done') {
+        received.result = data.result as GeneratedContent;
+      } else if (event === 'error') {
+        throw new Error(data.error as string);
+      }
+    });
+
+    if (!received.result) throw new Error('Ошибка генерации');
+    return received.result;
+  };
+
   const generateImage = async () => {
     if (!prompt.trim()) {
       toast.error('Введите описание для генерации изображения');
@@ -75,7 +145,7 @@ const AIContentGenerator = ({ onContentGenerated }: AIContentGeneratorProps) =>
 
     setGeneratingImage(true);
     try {
-      const response = await fetch('https://functions.poehali.dev/ai-content-generator', {
+      const response = await fetch(AI_API_URL, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ prompt, generateImageOnly: true })
@@ -148,6 +218,15 @@ const AIContentGenerator = ({ onContentGenerated }: AIContentGeneratorProps) =>
             </p>
           </div>
 
+          {generating && (preview.title || preview.description) && (
+            <Card>
+              <CardContent className="pt-6 space-y-2">
+                {preview.title && <p className="font-semibold">{preview.title}</p>}
+                {preview.description && <p className="text-sm text-muted-foreground">{preview.description}</p>}
+              </CardContent>
+            </Card>
+          )}
+
           <Card className="bg-muted/50">
             <CardHeader>
               <CardTitle className="text-sm flex items-center gap-2">
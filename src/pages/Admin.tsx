@@ -61,8 +61,8 @@ const Admin = () => {
   const loadData = async () => {
     try {
       const [newsRes, categoriesRes] = await Promise.all([
-        fetch(`${ADMIN_API_URL}?resource=news`),
-        fetch(`${ADMIN_API_URL}?resource=categories`)
+        fetch(`${ADMIN_API_URL}?resource=news&fresh=1`),
+        fetch(`${ADMIN_API_URL}?resource=categories&fresh=1`)
       ]);
       const newsData = await newsRes.json();
       const categoriesData = await categoriesRes.json();
@@ -77,7 +77,7 @@ const Admin = () => {
 
   const handleEditNews = async (id: number) => {
     try {
-      const response = await fetch(`${ADMIN_API_URL}?resource=news&id=${id}`);
+      const response = await fetch(`${ADMIN_API_URL}?resource=news&id=${id}&fresh=1`);
       const newsDetail = await response.json();
       setEditingNews(newsDetail);
       setIsCreatingNews(false);
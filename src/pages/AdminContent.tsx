@@ -48,7 +48,7 @@ const AdminContent = () => {
     setLoading(true);
     try {
       const [newsRes, articlesRes, pressRes, horoscopesRes, blogsRes, biographiesRes] = await Promise.all([
-        fetch(`${API_URL}?resource=news`),
+        fetch(`${API_URL}?resource=news&fresh=1`),
         fetch(`${API_URL}?resource=articles`),
         fetch(`${API_URL}?resource=press-releases`),
         fetch(`${API_URL}?resource=horoscopes`),
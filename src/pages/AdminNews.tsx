@@ -38,7 +38,7 @@ const AdminNews = () => {
 
   const loadNews = async () => {
     try {
-      const response = await fetch(`${API_URL}?resource=news`);
+      const response = await fetch(`${API_URL}?resource=news&fresh=1`);
       const data = await response.json();
       setNews(data);
     } catch (error) {
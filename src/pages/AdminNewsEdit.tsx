@@ -88,7 +88,7 @@ const AdminNewsEdit = () => {
 
   const loadNews = async () => {
     try {
-      const response = await fetch(`${API_URL}?resource=news&id=${id}`);
+      const response = await fetch(`${API_URL}?resource=news&id=${id}&fresh=1`);
       const data = await response.json();
       setForm({
         ...form,